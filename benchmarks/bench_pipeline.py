@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Smart Rover - Pipeline Benchmark Suite
+Runs the control and telemetry pipeline headless against the rover simulator
+and writes every result to JSON, so regressions show up before an APK build
+
+The app benchmark drives SmartRoverApp itself (startup, send_command, log
+refresh and frame times) and is skipped when Kivy is not installed.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--output results.json] [--skip-app]
+
+Results go to benchmarks/results/ (ignored by git) unless --output is given.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_transport import (bench_throughput, bench_latency, bench_reconnect,
+                             connected_worker, wait_for)
+from rover_log import CommandLog
+from rover_simulator import SimulatedLink
+from rover_store import TelemetryStore, DAY
+from rover_telemetry import (TelemetryParser, encode_frame, FRAME_DISTANCE, FRAME_LINE,
+                             FRAME_CLIMATE, FRAME_HEARTBEAT)
+
+# Default place for result files; ignored by git
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def summarize(samples, scale=1000.):
+    """p50/p95/p99/max of a list of seconds, in milliseconds by default"""
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+
+    def pct(value):
+        return ordered[min(last, int(round(value / 100. * last)))] * scale
+
+    return {'count': len(ordered), 'p50': pct(50), 'p95': pct(95), 'p99': pct(99),
+            'max': ordered[-1] * scale}
+
+
+def bench_parse(frames=200000, chunk_size=512):
+    """Telemetry parser throughput on a typical mix of frames"""
+    mix = [encode_frame(FRAME_LINE, 30, 220, 40), encode_frame(FRAME_DISTANCE, 87),
+           encode_frame(FRAME_LINE, 20, 240, 60), encode_frame(FRAME_HEARTBEAT, 1),
+           encode_frame(FRAME_LINE, 10, 230, 90), encode_frame(FRAME_CLIMATE, 241, 553)]
+    stream = b''.join(mix[i % len(mix)] for i in range(frames))
+    parser = TelemetryParser()
+    chunk = bytearray(chunk_size)
+
+    start = time.perf_counter()
+    for offset in range(0, len(stream), chunk_size):
+        count = min(chunk_size, len(stream) - offset)
+        chunk[:count] = stream[offset:offset + count]
+        parser.feed(chunk, count)
+    elapsed = time.perf_counter() - start
+    return {
+        'frames': parser.frames,
+        'bad_frames': parser.bad_frames,
+        'bytes_per_sec': len(stream) / elapsed,
+        'frames_per_sec': parser.frames / elapsed,
+    }
+
+
+def bench_log(entries=5000, depth=10):
+    """Cost of appending a log entry and rebuilding the visible text"""
+    log = CommandLog(depth=depth)
+    appends = []
+    renders = []
+    for i in range(entries):
+        start = time.perf_counter()
+        log.append(f"Sent: {'FLRBS'[i % 5]}")
+        middle = time.perf_counter()
+        log.text()
+        appends.append(middle - start)
+        renders.append(time.perf_counter() - middle)
+    append = summarize(appends, scale=1e6)
+    render = summarize(renders, scale=1e6)
+    return {
+        'entries': entries,
+        'append_p50_us': append['p50'],
+        'append_p99_us': append['p99'],
+        'text_p50_us': render['p50'],
+        'text_p99_us': render['p99'],
+    }
+
+
+def bench_send(count=20000):
+    """UI-thread cost of queueing a command on a connected transport"""
+    link = SimulatedLink(rates={})
+    worker = connected_worker(link)
+    calls = []
+    for i in range(count):
+        start = time.perf_counter()
+        worker.send('F' if i % 2 else 'L')
+        calls.append(time.perf_counter() - start)
+    wait_for(lambda: worker.in_flight == 0)
+    worker.stop()
+    result = summarize(calls, scale=1e6)
+    return {
+        'calls': count,
+        'calls_per_sec': count / sum(calls),
+        'call_p50_us': result['p50'],
+        'call_p99_us': result['p99'],
+    }
+
+
+def bench_store(hours=24, distance_hz=5):
+    """Telemetry store: record call cost, batch write rate and 24 h query times"""
+    directory = tempfile.mkdtemp(prefix='rover-store-')
+    store = TelemetryStore(os.path.join(directory, 'telemetry.db'))
+    store.start()
+    try:
+        now = time.time()
+        start_time = now - hours * 3600
+        calls = []
+        start = time.perf_counter()
+        # One day of climate at 0.5 Hz and distance at `distance_hz`, in flush-sized bursts
+        for second in range(0, hours * 3600, 2):
+            timestamp = start_time + second
+            call_start = time.perf_counter()
+            store.record_climate(timestamp, 20 + second % 50 / 10., 45 + second % 30 / 10.)
+            calls.append(time.perf_counter() - call_start)
+            for i in range(2 * distance_hz):
+                store.record_distance(timestamp + i / distance_hz, (second + i) % 200)
+            if second % 2000 == 0:
+                store.flush(30)
+        store.flush(30)
+        write_time = time.perf_counter() - start
+        record = summarize(calls, scale=1e6)
+
+        queries = {}
+        for name, query in (('climate_rows', lambda: store.rows('climate', now - DAY)),
+                            ('climate_rollup', lambda: store.rollup('climate', now - DAY)),
+                            ('distance_rollup', lambda: store.rollup('distance', now - DAY)),
+                            ('distance_summary', lambda: store.summary('distance', now - DAY))):
+            query_start = time.perf_counter()
+            rows = query()
+            queries[name + '_ms'] = (time.perf_counter() - query_start) * 1000
+            queries[name + '_rows'] = len(rows)
+        return dict({
+            'rows': store.rows_written,
+            'dropped': store.dropped,
+            'rows_per_sec': store.rows_written / write_time,
+            'record_p50_us': record['p50'],
+            'record_p99_us': record['p99'],
+        }, **queries)
+    finally:
+        store.stop()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def bench_app(duration=3.0, commands=200):
+    """Startup, send_command, log refresh and frame times of the real app"""
+    try:
+        os.environ.setdefault('KIVY_NO_ARGS', '1')
+        os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+        import kivy  # noqa: F401
+    except ImportError:
+        return {'skipped': 'Kivy not installed'}
+    os.environ.pop('ROVER_SERIAL_PORT', None)
+    os.environ.pop('ROVER_REPLAY', None)
+
+    import_start = time.perf_counter()
+    import rover_android_app
+    from kivy.clock import Clock
+    import_time = time.perf_counter() - import_start
+
+    # Sessions, recordings, missions and the telemetry store go to a scratch
+    # directory, never into the user's real app data
+    data_dir = tempfile.mkdtemp(prefix='rover-bench-')
+
+    class BenchmarkApp(rover_android_app.SmartRoverApp):
+        @property
+        def user_data_dir(self):
+            return data_dir
+
+    app = BenchmarkApp()
+    app.prewarm_screens = False
+    results = {'import_ms': import_time * 1000}
+
+    def frames(count=1):
+        for _ in range(count):
+            yield
+
+    def until(predicate, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() > deadline:
+                raise RuntimeError("Timed out")
+            yield
+
+    def scenario():
+        yield from frames(2)
+        results['startup_ms'] = {key: value * 1000 for key, value in app.startup_times.items()}
+
+        # Connect the control screen to the simulator
+        start = time.perf_counter()
+        control = app.ensure_screen('android_control')
+        results['control_screen_build_ms'] = (time.perf_counter() - start) * 1000
+        app.root.current = 'android_control'
+        control.selected_device = 'Simulator'
+        control.connect_desktop_simulation()
+        yield from until(lambda: control.bluetooth_connected)
+
+        # Command path: send_command calls from the UI thread
+        simulator = control.transport.link.simulator
+        executed = simulator.commands_executed
+        calls = []
+        start = time.perf_counter()
+        for i in range(commands):
+            call_start = time.perf_counter()
+            control.send_command('F' if i % 2 else 'L')
+            calls.append(time.perf_counter() - call_start)
+            yield
+        yield from until(lambda: control.transport.in_flight == 0)
+        elapsed = time.perf_counter() - start
+        summary = summarize(calls, scale=1e6)
+        results['send_command'] = {
+            'calls': commands,
+            'frames': commands,
+            'delivered': simulator.commands_executed - executed,
+            'delivered_per_sec': (simulator.commands_executed - executed) / elapsed,
+            'call_p50_us': summary['p50'],
+            'call_p99_us': summary['p99'],
+        }
+
+        # Log refresh: one label update per frame however many entries arrived
+        refreshes = []
+        for i in range(100):
+            for j in range(5):
+                control.log.append(f"Sent: {'FLRBS'[j]}")
+            start = time.perf_counter()
+            control._refresh_log(0)
+            refreshes.append(time.perf_counter() - start)
+            yield
+        results['log_refresh_ms'] = summarize(refreshes)
+
+        # Frame times on a live telemetry screen
+        app.ensure_screen('obstacle_detection')
+        app.root.current = 'obstacle_detection'
+        yield from frames(10)
+        frame_times = []
+        end = time.monotonic() + duration
+        last = time.perf_counter()
+        while time.monotonic() < end:
+            yield
+            now = time.perf_counter()
+            frame_times.append(now - last)
+            last = now
+        results['frame_ms'] = summarize(frame_times)
+        results['frame_ms']['fps'] = len(frame_times) / sum(frame_times)
+
+        control.transport.disconnect()
+        yield from frames(5)
+
+    steps = scenario()
+
+    def drive(dt):
+        try:
+            next(steps)
+        except StopIteration:
+            app.stop()
+            return False
+        except Exception as e:
+            results['error'] = str(e)
+            app.stop()
+            return False
+
+    Clock.schedule_interval(drive, 0)
+    try:
+        app.run()
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output', default=None,
+                        help='JSON file to write (default benchmarks/results/pipeline-<time>.json)')
+    parser.add_argument('--skip-app', action='store_true', help='skip the Kivy app benchmark')
+    args = parser.parse_args()
+
+    benches = [('parse', bench_parse), ('log', bench_log), ('send', bench_send),
+               ('store', bench_store),
+               ('throughput', bench_throughput), ('latency', bench_latency),
+               ('reconnect', bench_reconnect)]
+    if not args.skip_app:
+        benches.append(('app', bench_app))
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': {},
+    }
+    for name, bench in benches:
+        start = time.perf_counter()
+        result = bench()
+        report['results'][name] = result
+        print(f"{name} ({time.perf_counter() - start:.1f}s): {json.dumps(result)}")
+
+    if args.output is None:
+        args.output = os.path.join(RESULTS_DIR, time.strftime('pipeline-%Y%m%d-%H%M%S.json'))
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
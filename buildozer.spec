@@ -7,7 +7,7 @@ package.domain = org.collegeproject
 # Source code settings
 source.dir = .
 source.include_exts = py,png,jpg,kv,atlas,txt,md
-source.exclude_dirs = tests, bin, .git, __pycache__
+source.exclude_dirs = tests, tools, benchmarks, bin, .git, __pycache__
 
 # App version
 version = 1.0
@@ -16,7 +16,7 @@ version = 1.0
 source.main = main.py
 
 # Python requirements
-requirements = python3,kivy==2.1.0,pyjnius,plyer
+requirements = python3,kivy==2.1.0,pyjnius,plyer,sqlite3
 
 # App icon (optional - add icon.png to your project folder)
 #icon.filename = %(source.dir)s/icon.png
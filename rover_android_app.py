@@ -5,22 +5,46 @@ Smart Rover Android App - Kivy Version
 Complete hardware integration for Android APK deployment
 """
 
+import time
+
+# Startup timing reference, taken before any Kivy import
+IMPORT_START = time.perf_counter()
+
+# Only the widgets needed for the first screen are imported up front; the
+# KV rules resolve the mode screens' widgets through the Factory when they
+# are first built
 from kivy.app import App
 from kivy.uix.screenmanager import ScreenManager, Screen
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.gridlayout import GridLayout
 from kivy.uix.button import Button
 from kivy.uix.label import Label
-from kivy.uix.textinput import TextInput
-from kivy.uix.popup import Popup
-from kivy.uix.scrollview import ScrollView
-from kivy.uix.spinner import Spinner
+from kivy.properties import ObjectProperty, StringProperty
 from kivy.clock import Clock
 from kivy.core.window import Window
+import os
+import sqlite3
 import threading
-import time
 from datetime import datetime
 
+from rover_discovery import DeviceDiscovery, KnownRovers, device_entries, device_label
+from rover_drive import DriveScheduler
+from rover_fleet import FleetManager, GROUP_ALL
+from rover_log import CommandLog
+from rover_autonomy import ObstacleAvoider
+from rover_linefollow import LineFollower
+from rover_metrics import PROFILER
+from rover_mission import MissionStore, MissionError
+from rover_rates import TelemetryRateController
+from rover_session import SessionRecorder, SessionPlayer
+from rover_store import TelemetryStore, DAY
+from rover_telemetry import (TelemetryParser, parse_rate_command, FRAME_CLIMATE, FRAME_DISTANCE,
+                             FRAME_LINE)
+from rover_timeseries import SensorHistory, TimeSeries
+import rover_layouts  # noqa: F401  (KV rules for every screen)
+from rover_transport import (TransportWorker, RfcommLink, SerialLink, STATE_CONNECTING,
+                             STATE_CONNECTED, STATE_RECONNECTING, STATE_DISCONNECTED,
+                             STATE_ERROR)
+
 # Android Bluetooth imports
 try:
     from jnius import autoclass
@@ -45,272 +69,144 @@ except ImportError:
 # Set window size for mobile
 Window.size = (360, 640)
 
+# Visible command log entries; full history goes to the session file
+LOG_DEPTH = 10
+
+# Distance samples kept for the obstacle screen chart
+DISTANCE_HISTORY = 600
+
+# Live climate samples kept in memory (and backfilled from the store), seconds,
+# and the newest samples the live charts show
+CLIMATE_HISTORY = 3600
+CLIMATE_CHART_WINDOW = 300
+
+# Chart ranges the sensor screen cycles through: (button label, seconds,
+# rollup bucket seconds); the live range charts the in-memory ring instead
+CLIMATE_RANGES = (
+    ('live', None, None),
+    ('24 h', DAY, 60),
+    ('30 d', 30 * DAY, 3600),
+)
+
+# Seconds between telemetry rate re-evaluations
+RATE_UPDATE_INTERVAL = 2.0
+
+COMMAND_NAMES = {
+    'F': 'Forward',
+    'L': 'Left',
+    'R': 'Right',
+    'B': 'Backward',
+    'S': 'Stop'
+}
+
 class ModeSelectionScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.name = 'mode_selection'
-        
-        # Main layout
-        main_layout = BoxLayout(orientation='vertical', padding=20, spacing=15)
-        
-        # Title
-        title = Label(
-            text='🤖 Smart Rover Control',
-            font_size='24sp',
-            size_hint_y=None,
-            height='60dp',
-            color=(0.9, 0.9, 0.9, 1)
-        )
-        main_layout.add_widget(title)
-        
-        subtitle = Label(
-            text='8051 Microcontroller - HC-05 Bluetooth',
-            font_size='14sp',
-            size_hint_y=None,
-            height='40dp',
-            color=(0.7, 0.7, 0.7, 1)
-        )
-        main_layout.add_widget(subtitle)
-        
-        # Scrollable mode selection
-        scroll = ScrollView()
-        mode_layout = BoxLayout(orientation='vertical', spacing=15, size_hint_y=None)
-        mode_layout.bind(minimum_height=mode_layout.setter('height'))
-        
-        # Mode buttons
-        modes = [
-            ('📱 Android Control', 'android_control', (0.2, 0.6, 0.9, 1)),
-            ('🚧 Obstacle Detection', 'obstacle_detection', (0.9, 0.5, 0.1, 1)),
-            ('📍 Line Follower', 'line_follower', (0.6, 0.3, 0.7, 1)),
-            ('🌡️ Temperature & Humidity', 'sensor_monitoring', (0.1, 0.7, 0.4, 1))
-        ]
-        
-        for text, screen_name, color in modes:
-            btn = Button(
-                text=text,
-                size_hint_y=None,
-                height='80dp',
-                font_size='16sp',
-                background_color=color
-            )
-            btn.bind(on_press=lambda x, screen=screen_name: self.go_to_mode(screen))
-            mode_layout.add_widget(btn)
-        
-        scroll.add_widget(mode_layout)
-        main_layout.add_widget(scroll)
-        
-        self.add_widget(main_layout)
     
     def go_to_mode(self, screen_name):
+        # Mode screens are built on first visit
+        App.get_running_app().ensure_screen(screen_name)
         self.manager.current = screen_name
 
 class AndroidControlScreen(Screen):
-    def __init__(self, **kwargs):
+    def __init__(self, telemetry=None, **kwargs):
         super().__init__(**kwargs)
         self.name = 'android_control'
         self.bluetooth_connected = False
-        self.bluetooth_socket = None
+        self.selected_address = None
+        self.link_name = None
         
-        # Main layout
-        main_layout = BoxLayout(orientation='vertical', padding=10, spacing=10)
+        # Discovery streams devices in the background; known rovers fill the list at once
+        app = App.get_running_app()
+        self.known_rovers = app.known_rover_cache() if app else KnownRovers('known_rovers.json')
+        self.discovery = DeviceDiscovery(self.on_device_found, self.on_discovery_finished)
+        self.discovered = {}
+        self.device_entries = {}
+        self._devices_trigger = Clock.create_trigger(self._refresh_devices)
         
-        # Header
-        header_layout = BoxLayout(orientation='horizontal', size_hint_y=None, height='50dp')
+        # Scripted missions, played by the transport worker
+        self.missions = MissionStore(os.path.join(app.user_data_dir if app else '.', 'missions'))
+        self.mission_running = False
         
-        back_btn = Button(
-            text='← Back',
-            size_hint_x=None,
-            width='80dp',
-            background_color=(0.6, 0.6, 0.6, 1)
+        # All socket I/O runs on the transport worker thread
+        self.transport = TransportWorker(
+            on_state=self.on_transport_state,
+            on_result=self.on_transport_result,
+            telemetry=telemetry
         )
-        back_btn.bind(on_press=self.go_back)
-        header_layout.add_widget(back_btn)
+        self.transport.start()
         
-        title = Label(
-            text='📱 Android Control Mode',
-            font_size='18sp',
-            color=(0.9, 0.9, 0.9, 1)
-        )
-        header_layout.add_widget(title)
+        # Hold-to-drive repeater, rate-limited against the transport queue
+        self.drive = DriveScheduler(self.transport, on_deadman=self.on_drive_deadman)
         
-        main_layout.add_widget(header_layout)
+        # Telemetry stream rates are negotiated over this transport
+        if app is not None:
+            app.rates.attach(self.transport.send_config, wakeups=lambda: self.transport.wakeups,
+                             connected=lambda: self.transport.state == STATE_CONNECTED)
         
-        # Connection panel
-        conn_layout = BoxLayout(orientation='vertical', size_hint_y=None, height='120dp', spacing=5)
+        # Widgets updated from code; the layout is in rover_layouts
+        ids = self.ids
+        self.device_spinner = ids.device_spinner
+        self.connect_btn = ids.connect_btn
+        self.disconnect_btn = ids.disconnect_btn
+        self.status_label = ids.status_label
+        self.mission_spinner = ids.mission_spinner
+        self.mission_btn = ids.mission_btn
+        self.command_log = ids.command_log
+        self._refresh_devices(0)
+        self.mission_spinner.values = self.mission_names()
         
-        # Bluetooth device selection
-        device_layout = BoxLayout(orientation='horizontal', size_hint_y=None, height='40dp')
-        device_layout.add_widget(Label(text='HC-05 Device:', size_hint_x=None, width='100dp'))
-        
-        self.device_spinner = Spinner(
-            text='Select Device',
-            values=['HC-05', 'Scan for devices...'],
-            size_hint_x=0.6
-        )
-        self.device_spinner.bind(text=self.on_device_select)
-        device_layout.add_widget(self.device_spinner)
-        
-        scan_btn = Button(
-            text='🔍',
-            size_hint_x=None,
-            width='40dp',
-            background_color=(0.2, 0.6, 0.9, 1)
-        )
-        scan_btn.bind(on_press=self.scan_devices)
-        device_layout.add_widget(scan_btn)
-        
-        conn_layout.add_widget(device_layout)
-        
-        # Connection buttons
-        btn_layout = BoxLayout(orientation='horizontal', size_hint_y=None, height='40dp', spacing=10)
-        
-        self.connect_btn = Button(
-            text='Connect',
-            background_color=(0.1, 0.7, 0.1, 1)
-        )
-        self.connect_btn.bind(on_press=self.connect_bluetooth)
-        btn_layout.add_widget(self.connect_btn)
-        
-        self.disconnect_btn = Button(
-            text='Disconnect',
-            background_color=(0.8, 0.2, 0.2, 1),
-            disabled=True
-        )
-        self.disconnect_btn.bind(on_press=self.disconnect_bluetooth)
-        btn_layout.add_widget(self.disconnect_btn)
-        
-        conn_layout.add_widget(btn_layout)
-        
-        # Status
-        self.status_label = Label(
-            text='Status: Disconnected',
-            size_hint_y=None,
-            height='40dp',
-            color=(0.8, 0.2, 0.2, 1)
-        )
-        conn_layout.add_widget(self.status_label)
-        
-        main_layout.add_widget(conn_layout)
-        
-        # Command instructions
-        instructions = Label(
-            text='Control Commands: F=Forward, L=Left, R=Right, B=Backward, S=Stop',
-            size_hint_y=None,
-            height='60dp',
-            text_size=(None, None),
-            halign='center',
-            color=(0.8, 0.8, 0.8, 1)
-        )
-        main_layout.add_widget(instructions)
-        
-        # Control buttons
-        control_layout = GridLayout(cols=3, spacing=15, size_hint_y=None, height='300dp')
-        
-        # Row 1: Forward
-        control_layout.add_widget(Label())
-        forward_btn = Button(
-            text='↑\nFORWARD\n(F)',
-            background_color=(0.2, 0.6, 0.9, 1),
-            font_size='14sp'
-        )
-        forward_btn.bind(on_press=lambda x: self.send_command('F'))
-        control_layout.add_widget(forward_btn)
-        control_layout.add_widget(Label())
-        
-        # Row 2: Left, Stop, Right
-        left_btn = Button(
-            text='←\nLEFT\n(L)',
-            background_color=(0.2, 0.6, 0.9, 1),
-            font_size='14sp'
-        )
-        left_btn.bind(on_press=lambda x: self.send_command('L'))
-        control_layout.add_widget(left_btn)
-        
-        stop_btn = Button(
-            text='⏹\nSTOP\n(S)',
-            background_color=(0.8, 0.2, 0.2, 1),
-            font_size='14sp'
-        )
-        stop_btn.bind(on_press=lambda x: self.send_command('S'))
-        control_layout.add_widget(stop_btn)
-        
-        right_btn = Button(
-            text='→\nRIGHT\n(R)',
-            background_color=(0.2, 0.6, 0.9, 1),
-            font_size='14sp'
-        )
-        right_btn.bind(on_press=lambda x: self.send_command('R'))
-        control_layout.add_widget(right_btn)
-        
-        # Row 3: Backward
-        control_layout.add_widget(Label())
-        backward_btn = Button(
-            text='↓\nBACKWARD\n(B)',
-            background_color=(0.2, 0.6, 0.9, 1),
-            font_size='14sp'
-        )
-        backward_btn.bind(on_press=lambda x: self.send_command('B'))
-        control_layout.add_widget(backward_btn)
-        control_layout.add_widget(Label())
-        
-        main_layout.add_widget(control_layout)
-        
-        # Command log
-        log_label = Label(
-            text='Command Log:',
-            size_hint_y=None,
-            height='30dp',
-            color=(0.9, 0.9, 0.9, 1)
-        )
-        main_layout.add_widget(log_label)
-        
-        self.command_log = Label(
-            text='Ready to connect...',
-            text_size=(None, None),
-            halign='left',
-            valign='top',
-            color=(0.7, 0.7, 0.7, 1)
-        )
-        
-        log_scroll = ScrollView(size_hint_y=0.3)
-        log_scroll.add_widget(self.command_log)
-        main_layout.add_widget(log_scroll)
-        
-        self.add_widget(main_layout)
+        # Log store; the label is rebuilt at most once per frame
+        self.log = CommandLog(depth=LOG_DEPTH)
+        self._log_trigger = Clock.create_trigger(self._refresh_log)
     
-    def go_back(self, instance):
-        self.manager.current = 'mode_selection'
+    def on_leave(self, *args):
+        # Never keep driving on a screen the user can't see
+        if self.drive.active:
+            self.drive.release()
+        self.discovery.stop()
     
     def scan_devices(self, instance):
         """Scan for Bluetooth devices"""
-        if ANDROID_PLATFORM:
-            try:
-                adapter = BluetoothAdapter.getDefaultAdapter()
-                if adapter and adapter.isEnabled():
-                    # Get paired devices
-                    paired_devices = adapter.getBondedDevices().toArray()
-                    device_names = ['Select Device']
-                    
-                    for device in paired_devices:
-                        device_name = device.getName()
-                        if 'HC-05' in device_name or 'HC-06' in device_name:
-                            device_names.append(device_name)
-                    
-                    self.device_spinner.values = device_names
-                    self.show_popup("Scan Complete", f"Found {len(device_names)-1} HC-05 devices")
-                else:
-                    self.show_popup("Bluetooth Error", "Please enable Bluetooth first!")
-            except Exception as e:
-                self.show_popup("Scan Error", f"Error scanning devices:\n{str(e)}")
-        else:
-            # Desktop simulation
-            self.device_spinner.values = ['Select Device', 'HC-05 (Simulated)', 'HC-06 (Simulated)']
-            self.show_popup("Scan Complete", "Simulated scan complete")
+        if PROFILER.enabled:
+            start = time.perf_counter()
+        if self.discovery.running:
+            return
+        try:
+            # Results arrive through on_device_found as they are discovered
+            self.discovered = {}
+            self.discovery.start()
+            self.status_label.text = "Status: Scanning..."
+        except Exception as e:
+            self.show_popup("Scan Error", f"Error scanning devices:\n{str(e)}")
+        if PROFILER.enabled:
+            PROFILER.record('ui.scan', time.perf_counter() - start)
+    
+    def on_device_found(self, address, name, rssi):
+        """Add or update one discovered rover"""
+        self.discovered[address] = (name, rssi)
+        self.known_rovers.update(address, name, rssi)
+        self._devices_trigger()
+    
+    def on_discovery_finished(self, count):
+        """Report the scan and persist the rovers it found"""
+        if not self.bluetooth_connected:
+            self.status_label.text = "Status: Disconnected"
+        self.known_rovers.save_in_background()
+        self.show_popup("Scan Complete", f"Found {count} HC-05 devices")
+    
+    def _refresh_devices(self, dt):
+        # Rebuilds the device list once per frame however many results arrived
+        self.device_entries = device_entries(self.discovered, self.known_rovers.recent())
+        self.device_spinner.values = list(self.device_entries) + ['Scan for devices...']
     
     def on_device_select(self, spinner, text):
         """Handle device selection"""
-        if text != 'Select Device' and text != 'Scan for devices...':
-            self.selected_device = text
+        if text == 'Scan for devices...':
+            self.scan_devices(spinner)
+        elif text in self.device_entries:
+            self.selected_device, self.selected_address = self.device_entries[text]
     
     def connect_bluetooth(self, instance):
         """Connect to selected Bluetooth device"""
@@ -325,68 +221,130 @@ class AndroidControlScreen(Screen):
     
     def connect_android_bluetooth(self):
         """Connect using Android Bluetooth API"""
-        try:
-            adapter = BluetoothAdapter.getDefaultAdapter()
-            if not adapter.isEnabled():
-                self.show_popup("Bluetooth Error", "Please enable Bluetooth first!")
-                return
-            
-            # Find the selected device
-            paired_devices = adapter.getBondedDevices().toArray()
-            target_device = None
-            
-            for device in paired_devices:
-                if device.getName() == self.selected_device:
-                    target_device = device
-                    break
-            
-            if not target_device:
-                self.show_popup("Device Error", "Selected device not found!")
-                return
+        self.connect_btn.disabled = True
+        # An active inquiry slows RFCOMM connects down considerably
+        self.discovery.stop()
+        self.connect_link(RfcommLink(self.selected_device, address=self.selected_address))
+    
+    def connect_desktop_simulation(self):
+        """Desktop connection: a serial port/PTY if configured, else the rover simulator"""
+        self.connect_btn.disabled = True
+        serial_port = os.environ.get('ROVER_SERIAL_PORT')
+        if serial_port:
+            self.connect_link(SerialLink(serial_port))
+        else:
+            from rover_simulator import SimulatedLink
+            self.connect_link(SimulatedLink())
+    
+    def connect_link(self, link):
+        """Hand `link` to the transport worker"""
+        # State reaches the UI a frame late, when the worker may already
+        # have dropped the link: keep the name here instead of reading it back
+        self.link_name = link.name
+        self.transport.connect(link)
+    
+    def disconnect_bluetooth(self, instance):
+        """Disconnect from Bluetooth"""
+        self.disconnect_btn.disabled = True
+        self.transport.disconnect()
+    
+    def on_transport_state(self, state, detail):
+        """Apply connection state reported by the transport worker"""
+        if state == STATE_CONNECTING:
+            self.status_label.text = f"Status: Connecting to {self.selected_device}..."
+            self.status_label.color = (0.9, 0.7, 0.1, 1)
             
-            # Create socket and connect
-            uuid = UUID.fromString("00001101-0000-1000-8000-00805F9B34FB")  # SPP UUID
-            self.bluetooth_socket = target_device.createRfcommSocketToServiceRecord(uuid)
-            self.bluetooth_socket.connect()
+        elif state == STATE_CONNECTED and self.bluetooth_connected:
+            # Background reconnect succeeded, the session carries on
+            self.status_label.text = f"Status: Connected to {self.link_name}"
+            self.status_label.color = (0.1, 0.7, 0.1, 1)
+            self.log_command(f"Link {detail.lower() if detail else 'recovered'}")
+            self.resync_rates()
             
+        elif state == STATE_CONNECTED:
             self.bluetooth_connected = True
-            self.status_label.text = f"Status: Connected to {self.selected_device}"
+            self.open_log_session()
+            self.resync_rates()
+            if ANDROID_PLATFORM:
+                self.status_label.text = f"Status: Connected to {self.selected_device}"
+                self.log_command(f"Connected to {self.selected_device}")
+            else:
+                self.status_label.text = f"Status: Connected ({self.link_name})"
+                self.log_command(f"Connected in desktop mode via {self.link_name}")
             self.status_label.color = (0.1, 0.7, 0.1, 1)
             self.connect_btn.disabled = True
             self.disconnect_btn.disabled = False
             
-            self.log_command(f"Connected to {self.selected_device}")
-            
-        except Exception as e:
-            self.show_popup("Connection Error", f"Failed to connect:\n{str(e)}")
-            self.log_command(f"Connection failed: {str(e)}")
-    
-    def connect_desktop_simulation(self):
-        """Desktop simulation of connection"""
-        self.bluetooth_connected = True
-        self.status_label.text = f"Status: Connected (Desktop Mode)"
-        self.status_label.color = (0.1, 0.7, 0.1, 1)
-        self.connect_btn.disabled = True
-        self.disconnect_btn.disabled = False
-        
-        self.log_command("Connected in desktop simulation mode")
-    
-    def disconnect_bluetooth(self, instance):
-        """Disconnect from Bluetooth"""
-        try:
-            if self.bluetooth_socket:
-                self.bluetooth_socket.close()
+        elif state == STATE_RECONNECTING:
+            # Commands keep flowing into the transport per its outage policy
+            self.status_label.text = "Status: Link lost, reconnecting..."
+            self.status_label.color = (0.9, 0.7, 0.1, 1)
+            self.log_command(f"Reconnecting: {detail}")
             
+        elif state == STATE_ERROR:
             self.bluetooth_connected = False
             self.status_label.text = "Status: Disconnected"
             self.status_label.color = (0.8, 0.2, 0.2, 1)
             self.connect_btn.disabled = False
             self.disconnect_btn.disabled = True
+            self.show_popup("Connection Error", f"Failed to connect:\n{detail}")
+            self.log_command(f"Connection failed: {detail}")
             
+        elif state == STATE_DISCONNECTED:
+            self.bluetooth_connected = False
+            self.status_label.text = "Status: Disconnected"
+            self.status_label.color = (0.8, 0.2, 0.2, 1)
+            self.connect_btn.disabled = False
+            self.disconnect_btn.disabled = True
+            if detail:
+                self.show_popup("Disconnection Error", f"Error disconnecting:\n{detail}")
             self.log_command("Disconnected from HC-05")
-            
-        except Exception as e:
-            self.show_popup("Disconnection Error", f"Error disconnecting:\n{str(e)}")
+            self.log.close_session()
+            self.close_recording()
+    
+    def resync_rates(self):
+        """The rover boots streaming at its defaults; send the negotiated rates"""
+        app = App.get_running_app()
+        if app is not None:
+            app.rates.resync()
+    
+    def open_log_session(self):
+        """Stream this connection's full command history to disk"""
+        app = App.get_running_app()
+        if app is None:
+            return
+        directory = os.path.join(app.user_data_dir, 'sessions')
+        try:
+            self.log.open_session(directory)
+        except OSError as e:
+            print(f"Command session file unavailable: {e}")
+        # Binary recording of every byte sent and received, for replay
+        try:
+            self.transport.set_recorder(SessionRecorder.create(directory))
+        except OSError as e:
+            print(f"Session recording unavailable: {e}")
+    
+    def close_recording(self):
+        """Detach and close the transport's session recording"""
+        recorder = self.transport.recorder
+        if recorder is not None:
+            self.transport.set_recorder(None)
+            recorder.close()
+    
+    def on_transport_result(self, commands, error):
+        """Log the outcome of commands written by the transport worker"""
+        store = App.get_running_app().store
+        now = time.time()
+        for command in commands:
+            # Rate commands configure the link; they are not drive history
+            if parse_rate_command(command) is not None:
+                continue
+            store.record_command(now, command, ok=not error)
+            if error:
+                self.log_command(f"Error sending {command}: {error}")
+            else:
+                command_name = COMMAND_NAMES.get(command, command)
+                self.log_command(f"Sent: {command} ({command_name})")
     
     def send_command(self, command):
         """Send command to rover"""
@@ -394,47 +352,136 @@ class AndroidControlScreen(Screen):
             self.show_popup("Not Connected", "Please connect to HC-05 first!")
             return
         
+        self.transport.send(command)
+    
+    def start_drive(self, direction):
+        """Begin holding a direction"""
+        if not self.bluetooth_connected:
+            self.show_popup("Not Connected", "Please connect to HC-05 first!")
+            return
+        
+        # Any manual input, Stop included, takes over from a running mission
+        if self.mission_running:
+            self.abort_mission()
+        
+        if PROFILER.enabled:
+            start = time.perf_counter()
+        self.drive.press(direction)
+        if PROFILER.enabled:
+            PROFILER.record('ui.command', time.perf_counter() - start)
+    
+    def stop_drive(self):
+        """Release the held direction and stop the rover"""
+        if self.drive.active:
+            self.drive.release()
+    
+    def mission_names(self):
         try:
-            if ANDROID_PLATFORM and self.bluetooth_socket:
-                # Send via Android Bluetooth
-                output_stream = self.bluetooth_socket.getOutputStream()
-                command_bytes = f"{command}\n".encode('utf-8')
-                output_stream.write(command_bytes)
-                output_stream.flush()
-            
-            command_names = {
-                'F': 'Forward',
-                'L': 'Left',
-                'R': 'Right',
-                'B': 'Backward',
-                'S': 'Stop'
-            }
-            
-            command_name = command_names.get(command, command)
-            self.log_command(f"Sent: {command} ({command_name})")
-            
-        except Exception as e:
-            self.show_popup("Command Error", f"Failed to send command:\n{str(e)}")
-            self.log_command(f"Error sending {command}: {str(e)}")
+            return self.missions.names()
+        except OSError as e:
+            print(f"Mission store unavailable: {e}")
+            return []
     
-    def log_command(self, message):
-        """Log command to display"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        log_entry = f"[{timestamp}] {message}"
+    def toggle_mission(self, instance):
+        """Run the selected mission, or abort the one running"""
+        if self.mission_running:
+            self.abort_mission()
+            return
+        if not self.bluetooth_connected:
+            self.show_popup("Not Connected", "Please connect to HC-05 first!")
+            return
+        name = self.mission_spinner.text
+        try:
+            mission = self.missions.load(name)
+        except (OSError, MissionError) as e:
+            self.show_popup("Mission Error", f"Cannot load {name}:\n{str(e)}")
+            return
         
-        current_text = self.command_log.text
-        if current_text == "Ready to connect...":
-            self.command_log.text = log_entry
+        if self.drive.active:
+            self.drive.release()
+        if self.transport.run_schedule(mission.schedule, self.on_mission_done):
+            self.mission_running = True
+            self.mission_btn.text = 'Abort'
+            self.mission_btn.background_color = (0.8, 0.2, 0.2, 1)
+            self.log_command(f"Mission {name}: {mission.steps} writes over {mission.duration:.1f} s")
+    
+    def abort_mission(self):
+        """Stop the running mission and the rover"""
+        self.transport.abort_schedule()
+    
+    def on_mission_done(self, report):
+        """Report how closely the mission kept to its schedule"""
+        self.mission_running = False
+        self.mission_btn.text = 'Run'
+        self.mission_btn.background_color = (0.1, 0.7, 0.1, 1)
+        if report['error']:
+            outcome = f"failed: {report['error']}"
+        elif report['aborted']:
+            outcome = "aborted"
         else:
-            # Keep only last 10 entries
-            lines = current_text.split('\n')
-            if len(lines) >= 10:
-                lines = lines[-9:]
-            lines.append(log_entry)
-            self.command_log.text = '\n'.join(lines)
+            outcome = "complete"
+        message = f"Mission {outcome} ({report['executed']}/{report['steps']} writes)"
+        if 'lateness_p99' in report:
+            message += (f", timing p50/p99/max {report['lateness_p50'] * 1000:.2f}/"
+                        f"{report['lateness_p99'] * 1000:.2f}/{report['lateness_max'] * 1000:.2f} ms")
+        self.log_command(message)
+    
+    def edit_mission(self, instance):
+        """Edit and save a mission script"""
+        from kivy.uix.popup import Popup
+        from kivy.uix.textinput import TextInput
+        name = self.mission_spinner.text
+        try:
+            source = self.missions.source(name)
+        except (OSError, MissionError):
+            name, source = '', "forward 1\nstop\n"
+        
+        content = BoxLayout(orientation='vertical', spacing=5)
+        name_input = TextInput(text=name, hint_text='Mission name', multiline=False,
+                               size_hint_y=None, height='40dp')
+        content.add_widget(name_input)
+        source_input = TextInput(text=source)
+        content.add_widget(source_input)
+        save_btn = Button(text='Save', size_hint_y=None, height='40dp',
+                          background_color=(0.1, 0.7, 0.1, 1))
+        content.add_widget(save_btn)
+        
+        popup = Popup(title='Edit Mission', content=content, size_hint=(0.95, 0.8))
+        
+        def save(instance):
+            try:
+                mission = self.missions.save(name_input.text, source_input.text)
+            except (OSError, MissionError) as e:
+                self.show_popup("Mission Error", str(e))
+                return
+            self.mission_spinner.values = self.mission_names()
+            self.mission_spinner.text = mission.name
+            popup.dismiss()
+        
+        save_btn.bind(on_press=save)
+        popup.open()
+    
+    def on_drive_deadman(self, direction):
+        """Report a hold cancelled by the deadman timeout"""
+        self.log_command(f"Deadman stop while holding {direction}")
+    
+    def log_command(self, message):
+        """Log command to display"""
+        self.log.append(message)
+        self._log_trigger()
+    
+    def _refresh_log(self, dt):
+        # Coalesces every entry logged during a frame into one texture update
+        if self.log.dirty:
+            if PROFILER.enabled:
+                start = time.perf_counter()
+            self.command_log.text = self.log.text()
+            if PROFILER.enabled:
+                PROFILER.record('ui.log_refresh', time.perf_counter() - start)
     
     def show_popup(self, title, message):
         """Show popup message"""
+        from kivy.uix.popup import Popup
         popup = Popup(
             title=title,
             content=Label(text=message),
@@ -442,80 +489,674 @@ class AndroidControlScreen(Screen):
         )
         popup.open()
 
-# Placeholder screens for other modes (similar structure)
-class ObstacleDetectionScreen(Screen):
+class TelemetryScreen(Screen):
+    """Base for screens showing live rover telemetry
+
+    While the screen is visible it polls the shared TelemetryState once per
+    frame and only touches widgets when a stream's sequence number moved.
+    """
+    # Readouts re-render (one texture upload each) at most this often;
+    # the charts run their own clocks
+    refresh_rate = 10
+    
+    # Telemetry rates ({frame type: Hz}) requested from the rover while visible
+    stream_rates = {}
+    
+    def __init__(self, telemetry=None, **kwargs):
+        super().__init__(**kwargs)
+        self.telemetry = telemetry
+        self.charts = []
+        self._refresh_event = None
+        self._seen_seq = None
+    
+    def on_enter(self, *args):
+        if self.telemetry is not None and self._refresh_event is None:
+            self._refresh_event = Clock.schedule_interval(self._refresh, 1. / self.refresh_rate)
+        for chart in self.charts:
+            chart.start()
+        App.get_running_app().rates.require(self.name, self.stream_rates)
+    
+    def on_leave(self, *args):
+        if self._refresh_event is not None:
+            self._refresh_event.cancel()
+            self._refresh_event = None
+        for chart in self.charts:
+            chart.stop()
+        # Streams only this screen needed are paused on the rover
+        App.get_running_app().rates.release(self.name)
+    
+    def _refresh(self, dt):
+        seq = self.stream_seq(self.telemetry.state)
+        if seq != self._seen_seq:
+            self._seen_seq = seq
+            if PROFILER.enabled:
+                start = time.perf_counter()
+            self.update_telemetry(self.telemetry.state)
+            if PROFILER.enabled:
+                PROFILER.record('ui.telemetry_update', time.perf_counter() - start)
+    
+    def control_screen(self):
+        """Screen owning the transport, built on demand"""
+        return App.get_running_app().ensure_screen('android_control')
+    
+    def command_sink(self):
+        """Where a controller's commands go, or None when it cannot start
+
+        While a session is replayed the controllers run without a live link
+        and their commands are reported instead of sent.
+        """
+        app = App.get_running_app()
+        if app.player is not None:
+            return app.on_replay_command
+        control = self.control_screen()
+        if not control.bluetooth_connected:
+            control.show_popup("Not Connected", "Please connect to HC-05 first!")
+            return None
+        return control.transport.send
+    
+    def stream_seq(self, state):
+        """Sequence counter of the stream this screen displays"""
+        return 0
+    
+    def update_telemetry(self, state):
+        """Refresh widgets from the latest telemetry"""
+        pass
+
+class ObstacleDetectionScreen(TelemetryScreen):
+    stream_rates = {FRAME_DISTANCE: 20}
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.name = 'obstacle_detection'
         
-        layout = BoxLayout(orientation='vertical', padding=20, spacing=20)
+        ids = self.ids
+        self.distance_label = ids.distance_label
+        self.safe_label = ids.safe_label
+        self.auto_btn = ids.auto_btn
+        self.latency_label = ids.latency_label
         
-        # Header
-        header = BoxLayout(orientation='horizontal', size_hint_y=None, height='50dp')
-        back_btn = Button(text='← Back', size_hint_x=None, width='80dp')
-        back_btn.bind(on_press=lambda x: setattr(self.manager, 'current', 'mode_selection'))
-        header.add_widget(back_btn)
-        header.add_widget(Label(text='🚧 Obstacle Detection', font_size='18sp'))
-        layout.add_widget(header)
+        # Distance history for the live chart, fed from the reader thread
+        self.distance_series = TimeSeries(DISTANCE_HISTORY, ('distance',))
+        if self.telemetry is not None:
+            self.telemetry.add_listener(FRAME_DISTANCE, self._on_distance_frame)
+        ids.distance_chart.set_series(self.distance_series, window=DISTANCE_HISTORY)
+        self.charts.append(ids.distance_chart)
         
-        layout.add_widget(Label(text='Obstacle Detection Mode\n\n🚀 Features:\n• Real-time distance monitoring\n• Automatic obstacle avoidance\n• Configurable safe distance\n• Activity logging\n\n📱 Ready for hardware integration!', 
-                               text_size=(None, None), halign='center'))
+        self.avoider = ObstacleAvoider(self.send_command)
+        self._avoid_event = None
+        # Transport send, captured on the UI thread when avoidance starts
+        self._send = None
+    
+    def stream_seq(self, state):
+        return state.distance_seq
+    
+    def update_telemetry(self, state):
+        self.distance_label.text = f"Distance: {state.distance} cm"
+    
+    def _on_distance_frame(self, values, timestamp):
+        self.distance_series.append(timestamp, values)
+    
+    def on_safe_distance(self, slider, value):
+        self.avoider.safe_distance = int(value)
+        self.safe_label.text = f'Safe: {int(value)} cm'
+    
+    def send_command(self, command):
+        """Queue an avoidance command; called from the reader thread"""
+        if self._send is not None:
+            self._send(command)
+    
+    def toggle_avoidance(self, instance):
+        """Start or stop automatic obstacle avoidance"""
+        if self.avoider.running:
+            self.stop_avoidance()
+            return
+        
+        send = self.command_sink()
+        if send is None:
+            return
         
-        self.add_widget(layout)
+        self._send = send
+        self.avoider.start(live=App.get_running_app().player is None)
+        self.telemetry.add_listener(FRAME_DISTANCE, self.avoider.on_distance)
+        self._avoid_event = Clock.schedule_interval(self._watch_avoidance, 0.25)
+        self.auto_btn.text = 'Stop Avoidance'
+        self.auto_btn.background_color = (0.8, 0.2, 0.2, 1)
+    
+    def stop_avoidance(self):
+        if self._avoid_event is not None:
+            self._avoid_event.cancel()
+            self._avoid_event = None
+        self.telemetry.remove_listener(FRAME_DISTANCE, self.avoider.on_distance)
+        self.avoider.stop()
+        self.auto_btn.text = 'Start Avoidance'
+        self.auto_btn.background_color = (0.9, 0.5, 0.1, 1)
+    
+    def _watch_avoidance(self, dt):
+        if self.avoider.check_stale():
+            self.latency_label.text = 'No distance data - rover stopped'
+        else:
+            self.latency_label.text = self.avoider.report()
+    
+    def on_leave(self, *args):
+        super().on_leave(*args)
+        if self.avoider.running:
+            self.stop_avoidance()
 
-class LineFollowerScreen(Screen):
+class LineFollowerScreen(TelemetryScreen):
+    stream_rates = {FRAME_LINE: 50}
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.name = 'line_follower'
         
-        layout = BoxLayout(orientation='vertical', padding=20, spacing=20)
+        ids = self.ids
+        self.ir_label = ids.ir_label
+        self.position_label = ids.position_label
+        self.follow_btn = ids.follow_btn
         
-        # Header
-        header = BoxLayout(orientation='horizontal', size_hint_y=None, height='50dp')
-        back_btn = Button(text='← Back', size_hint_x=None, width='80dp')
-        back_btn.bind(on_press=lambda x: setattr(self.manager, 'current', 'mode_selection'))
-        header.add_widget(back_btn)
-        header.add_widget(Label(text='📍 Line Follower', font_size='18sp'))
-        layout.add_widget(header)
+        self.follower = LineFollower(self.send_command)
+        # Transport send, captured on the UI thread when following starts
+        self._send = None
         
-        layout.add_widget(Label(text='Line Follower Mode\n\n🚀 Features:\n• 3-sensor IR array monitoring\n• Real-time line position detection\n• Speed control settings\n• Automatic path following\n\n📱 Ready for hardware integration!', 
-                               text_size=(None, None), halign='center'))
+        # PID gains
+        self.gain_inputs = {name: ids[name] for name in ('kp', 'ki', 'kd')}
+        for name, gain_input in self.gain_inputs.items():
+            gain_input.text = str(getattr(self.follower.pid, name))
+    
+    def stream_seq(self, state):
+        return state.line_seq
+    
+    def update_telemetry(self, state):
+        self.ir_label.text = f"IR  L: {state.ir_left}  C: {state.ir_center}  R: {state.ir_right}"
+        if self.follower.running:
+            position = self.follower.position
+            if position is None:
+                self.position_label.text = f"Line lost - searching ({self.follower.command})"
+            else:
+                self.position_label.text = (f"Line position: {position:+.2f}   "
+                                            f"steer: {self.follower.steering:+.2f}")
+    
+    def send_command(self, command):
+        """Queue a steering command; called from the reader thread"""
+        if self._send is not None:
+            self._send(command)
+    
+    def toggle_following(self, instance):
+        """Start or stop automatic line following"""
+        if self.follower.running:
+            self.stop_following()
+            return
+        
+        send = self.command_sink()
+        if send is None:
+            return
+        
+        pid = self.follower.pid
+        try:
+            pid.kp, pid.ki, pid.kd = (float(self.gain_inputs[name].text) for name in ('kp', 'ki', 'kd'))
+        except ValueError:
+            self.control_screen().show_popup("Invalid Gains", "PID gains must be numbers")
+            return
         
-        self.add_widget(layout)
+        log_path = None
+        app = App.get_running_app()
+        if app is not None:
+            directory = os.path.join(app.user_data_dir, 'linelogs')
+            try:
+                os.makedirs(directory, exist_ok=True)
+                log_path = os.path.join(directory, datetime.now().strftime("line-%Y%m%d-%H%M%S.csv"))
+            except OSError as e:
+                print(f"Line log unavailable: {e}")
+        
+        self._send = send
+        self.follower.start(log_path=log_path)
+        self.telemetry.add_listener(FRAME_LINE, self.follower.on_line)
+        self.follow_btn.text = 'Stop Following'
+        self.follow_btn.background_color = (0.8, 0.2, 0.2, 1)
+    
+    def stop_following(self):
+        self.telemetry.remove_listener(FRAME_LINE, self.follower.on_line)
+        self.follower.stop()
+        self.follow_btn.text = 'Start Following'
+        self.follow_btn.background_color = (0.6, 0.3, 0.7, 1)
+    
+    def on_leave(self, *args):
+        super().on_leave(*args)
+        if self.follower.running:
+            self.stop_following()
 
-class SensorMonitoringScreen(Screen):
+class SensorMonitoringScreen(TelemetryScreen):
+    # The DHT22 cannot be sampled faster than every 2 seconds
+    stream_rates = {FRAME_CLIMATE: 0.5}
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.name = 'sensor_monitoring'
         
-        layout = BoxLayout(orientation='vertical', padding=20, spacing=20)
+        ids = self.ids
+        self.climate_label = ids.climate_label
+        self.stats_label = ids.stats_label
+        self.range_btn = ids.range_btn
+        self.day_summary = ''
+        
+        # Fixed-memory history, fed directly from the telemetry reader thread
+        # once it holds what the telemetry store kept from earlier runs
+        self.history = SensorHistory(capacity=CLIMATE_HISTORY)
+        if self.telemetry is not None:
+            threading.Thread(target=self._backfill, name='climate-backfill', daemon=True).start()
+        
+        # Per-minute means of the last day and hourly means of the last month,
+        # loaded from the store's rollups when their range is shown
+        self.range_index = 0
+        self.range_series = {}
+        
+        # Live charts over the raw ring
+        self.charts = [ids.temperature_chart, ids.humidity_chart]
+        self._apply_range()
+    
+    def stream_seq(self, state):
+        return state.climate_seq
+    
+    def update_telemetry(self, state):
+        self.climate_label.text = f"{state.temperature:.1f} °C    {state.humidity:.1f} %RH"
+        
+        t_min, t_max, t_mean = self.history.summary('temperature')
+        h_min, h_max, h_mean = self.history.summary('humidity')
+        if t_mean is not None:
+            self.stats_label.text = (f"Temp min/avg/max: {t_min:.1f} / {t_mean:.1f} / {t_max:.1f} °C\n"
+                                     f"RH min/avg/max: {h_min:.1f} / {h_mean:.1f} / {h_max:.1f} %\n"
+                                     f"{self.day_summary}")
+    
+    def _on_climate_frame(self, values, timestamp):
+        # Reader thread: raw values are tenths of a degree / percent
+        self.history.append(time.time(), values[0] / 10., values[1] / 10.)
+    
+    def _backfill(self):
+        # Replays the last hour from the store so the live charts survive restarts;
+        # live frames are only appended after it, keeping the ring in time order
+        try:
+            for row in App.get_running_app().store.rows('climate', time.time() - CLIMATE_HISTORY):
+                self.history.append(*row)
+        except sqlite3.Error as e:
+            print(f"Climate history unavailable: {e}")
+        self.telemetry.add_listener(FRAME_CLIMATE, self._on_climate_frame)
+    
+    def on_enter(self, *args):
+        super().on_enter(*args)
+        self.load_range()
+    
+    def toggle_range(self, instance):
+        """Cycle the charts through the live hour, the last day and the last month"""
+        self.range_index = (self.range_index + 1) % len(CLIMATE_RANGES)
+        following = CLIMATE_RANGES[(self.range_index + 1) % len(CLIMATE_RANGES)][0]
+        self.range_btn.text = f'Show {following}'
+        self.load_range()
+        self._apply_range()
+    
+    def _apply_range(self):
+        series = self.range_series.get(self.range_index)
+        for chart in self.charts:
+            if self.range_index == 0:
+                chart.set_series(self.history.raw, window=CLIMATE_CHART_WINDOW, lock=self.history.lock)
+            elif series is not None:
+                chart.set_series(series, window=series.capacity)
+    
+    def load_range(self):
+        """Refresh the shown range's chart and the 24 h summary from the store's rollups"""
+        threading.Thread(target=self._load_range, args=(self.range_index,),
+                         name='climate-range', daemon=True).start()
+    
+    def _load_range(self, index):
+        store = App.get_running_app().store
+        now = time.time()
+        period, bucket = CLIMATE_RANGES[index][1:]
+        try:
+            rows = store.rollup('climate', now - period, bucket=bucket) if period else None
+            summary = store.summary('climate', now - DAY)
+        except sqlite3.Error as e:
+            print(f"Climate history unavailable: {e}")
+            return
+        series = None
+        if rows is not None:
+            # Rollup rows: (ts, temperature mean/min/max, humidity mean/min/max)
+            series = TimeSeries(period // bucket + 1, self.history.fields)
+            for row in rows:
+                series.append(row[0], (row[1], row[4]))
+        t_min, t_max, t_mean = summary['temperature']
+        day_summary = f"24 h min/max: {t_min:.1f} / {t_max:.1f} °C" if t_mean is not None else ''
+        
+        def apply(dt):
+            self.day_summary = day_summary
+            if series is not None:
+                self.range_series[index] = series
+                if index == self.range_index:
+                    self._apply_range()
+        
+        Clock.schedule_once(apply, 0)
+    
+    def export_csv(self, instance):
+        """Export the last day of readings from the store without blocking the UI"""
+        app = App.get_running_app()
+        directory = os.path.join(app.user_data_dir, 'exports')
+        path = os.path.join(directory, datetime.now().strftime("climate-%Y%m%d-%H%M%S.csv"))
+        
+        def run():
+            try:
+                os.makedirs(directory, exist_ok=True)
+                app.store.flush()
+                rows = app.store.export_csv(path, 'climate', time.time() - DAY)
+                message = f"Saved {rows} rows to\n{path}"
+            except (OSError, sqlite3.Error) as e:
+                message = f"Export failed:\n{str(e)}"
+            Clock.schedule_once(lambda dt: self.show_popup("CSV Export", message), 0)
         
-        # Header
-        header = BoxLayout(orientation='horizontal', size_hint_y=None, height='50dp')
-        back_btn = Button(text='← Back', size_hint_x=None, width='80dp')
-        back_btn.bind(on_press=lambda x: setattr(self.manager, 'current', 'mode_selection'))
-        header.add_widget(back_btn)
-        header.add_widget(Label(text='🌡️ Sensor Monitor', font_size='18sp'))
-        layout.add_widget(header)
+        threading.Thread(target=run, name='csv-export', daemon=True).start()
+    
+    def show_popup(self, title, message):
+        """Show popup message"""
+        from kivy.uix.popup import Popup
+        popup = Popup(
+            title=title,
+            content=Label(text=message),
+            size_hint=(0.8, 0.4)
+        )
+        popup.open()
+
+class FleetRoverRow(BoxLayout):
+    """Status row with selection and remove controls for one fleet rover"""
+    rover_id = StringProperty('')
+    label = StringProperty('')
+    screen = ObjectProperty(None)
+
+class FleetControlScreen(Screen):
+    """Drives several rovers at once through a FleetManager"""
+    refresh_rate = 10
+    
+    def __init__(self, telemetry=None, **kwargs):
+        super().__init__(**kwargs)
+        self.name = 'fleet_control'
         
-        layout.add_widget(Label(text='Temperature & Humidity Mode\n\n🚀 Features:\n• Real-time DHT22 sensor readings\n• Color-coded status indicators\n• Data logging with timestamps\n• CSV export functionality\n\n📱 Ready for hardware integration!', 
-                               text_size=(None, None), halign='center'))
+        # One transport worker per rover, keyed by MAC address: lab rovers
+        # usually all keep the default "HC-05" name
+        self.fleet = FleetManager()
+        self.rows = {}
+        self._refresh_event = None
         
-        self.add_widget(layout)
+        # Same device list as the control screen: known rovers at once,
+        # discovery results as they stream in
+        self.known_rovers = App.get_running_app().known_rover_cache()
+        self.discovery = DeviceDiscovery(self.on_device_found, self.on_discovery_finished)
+        self.discovered = {}
+        self.device_entries = {}
+        self._devices_trigger = Clock.create_trigger(self._refresh_devices)
+        
+        ids = self.ids
+        self.device_spinner = ids.device_spinner
+        self.target_spinner = ids.target_spinner
+        self.summary_label = ids.summary_label
+        self.rover_layout = ids.rover_layout
+        self._refresh_devices(0)
+    
+    def on_enter(self, *args):
+        if self._refresh_event is None:
+            self._refresh_event = Clock.schedule_interval(self._refresh, 1. / self.refresh_rate)
+    
+    def on_leave(self, *args):
+        if self._refresh_event is not None:
+            self._refresh_event.cancel()
+            self._refresh_event = None
+        self.discovery.stop()
+    
+    def scan_devices(self):
+        """Discover nearby rovers in the background"""
+        if self.discovery.running:
+            return
+        try:
+            self.discovered = {}
+            self.discovery.start()
+            self.summary_label.text = "Scanning..."
+        except Exception as e:
+            print(f"Scan failed: {e}")
+            self.summary_label.text = f"Scan failed: {e}"
+    
+    def on_device_found(self, address, name, rssi):
+        self.discovered[address] = (name, rssi)
+        self.known_rovers.update(address, name, rssi)
+        self._devices_trigger()
+    
+    def on_discovery_finished(self, count):
+        self.known_rovers.save_in_background()
+        self.summary_label.text = (f"Found {count} rovers; {self.fleet.connected_count()} of "
+                                   f"{len(self.fleet.rovers)} connected")
+    
+    def _refresh_devices(self, dt):
+        self.device_entries = device_entries(self.discovered, self.known_rovers.recent())
+        self.device_spinner.values = list(self.device_entries) + ['Scan for devices...']
+    
+    def on_device_select(self, spinner, text):
+        if text == 'Scan for devices...':
+            self.scan_devices()
+    
+    def add_rover(self, instance):
+        """Connect the selected device as another fleet member"""
+        entry = self.device_entries.get(self.device_spinner.text)
+        if entry is None:
+            return
+        name, address = entry
+        if address in self.fleet.rovers:
+            return
+        # An active inquiry slows RFCOMM connects down considerably
+        self.discovery.stop()
+        if ANDROID_PLATFORM:
+            link = RfcommLink(name, address=address)
+        else:
+            from rover_simulator import SimulatedLink
+            link = SimulatedLink()
+        self.fleet.add(address, link)
+        self.add_row(address, device_label(name, address))
+    
+    def add_row(self, rover_id, label):
+        """Status row with selection and remove controls for one rover"""
+        row = FleetRoverRow(rover_id=rover_id, label=label, screen=self)
+        status = row.ids.status
+        self.rows[rover_id] = (row, status)
+        self.rover_layout.add_widget(row)
+    
+    def select_rover(self, rover_id, selected):
+        if selected:
+            self.fleet.join('selected', rover_id)
+        else:
+            self.fleet.leave('selected', rover_id)
+    
+    def remove_rover(self, rover_id):
+        """Drop a rover and its row; its link is closed in the background"""
+        self.fleet.remove(rover_id, background=True)
+        row, status = self.rows.pop(rover_id)
+        self.rover_layout.remove_widget(row)
+    
+    def target_group(self):
+        return 'selected' if self.target_spinner.text == 'Selected rovers' else GROUP_ALL
+    
+    def send_group(self, command):
+        """Queue a command for every rover in the current target"""
+        self.fleet.send_group(self.target_group(), command)
+    
+    def all_stop(self, instance):
+        """Stop the whole fleet regardless of the current target"""
+        self.fleet.all_stop()
+    
+    def _refresh(self, dt):
+        # Only rovers whose status moved since the last tick are redrawn
+        changes = self.fleet.changes()
+        if not changes:
+            return
+        for rover in changes:
+            if rover.rover_id not in self.rows:
+                continue
+            row, status = self.rows[rover.rover_id]
+            text = f"{row.label}: {rover.state}"
+            if rover.last_command:
+                text += f" ({COMMAND_NAMES.get(rover.last_command, rover.last_command)})"
+            status.text = text
+            if rover.connected:
+                status.color = (0.1, 0.7, 0.1, 1)
+            elif rover.state in (STATE_CONNECTING, STATE_RECONNECTING):
+                status.color = (0.9, 0.7, 0.1, 1)
+            else:
+                status.color = (0.8, 0.2, 0.2, 1)
+        self.summary_label.text = (f"{self.fleet.connected_count()} of "
+                                   f"{len(self.fleet.rovers)} rovers connected")
 
 class SmartRoverApp(App):
+    # Mode screens, built on first navigation instead of in build()
+    screen_factories = {
+        'android_control': AndroidControlScreen,
+        'obstacle_detection': ObstacleDetectionScreen,
+        'line_follower': LineFollowerScreen,
+        'sensor_monitoring': SensorMonitoringScreen,
+        'fleet_control': FleetControlScreen,
+    }
+    
+    # Build the remaining screens in the background once the first frame is up
+    prewarm_screens = True
+    prewarm_delay = 0.5
+    
     def build(self):
+        build_start = time.perf_counter()
+        self.startup_times = {'imports': build_start - IMPORT_START}
+        self.screen_build_times = {}
+        
+        # Shared parser fed by the transport's telemetry reader
+        self.telemetry = TelemetryParser()
+        self.player = None
+        self.known_rovers = None
+        
+        # Per-stream rates follow the visible screen, link throughput and battery
+        self.rates = TelemetryRateController(self.telemetry)
+        
+        # Telemetry and command history persisted across runs, written in
+        # batches on the store's own thread
+        self.store = TelemetryStore(os.path.join(self.user_data_dir, 'telemetry.db'))
+        self.store.start()
+        self.telemetry.add_listener(FRAME_CLIMATE, self.store.on_climate)
+        self.telemetry.add_listener(FRAME_DISTANCE, self.store.on_distance)
+        
         # Create screen manager
         sm = ScreenManager()
-        
-        # Add screens
         sm.add_widget(ModeSelectionScreen())
-        sm.add_widget(AndroidControlScreen())
-        sm.add_widget(ObstacleDetectionScreen())
-        sm.add_widget(LineFollowerScreen())
-        sm.add_widget(SensorMonitoringScreen())
         
+        self.startup_times['build'] = time.perf_counter() - build_start
         return sm
+    
+    def toggle_overlay(self):
+        """Show or hide the performance overlay, enabling the profiler with it"""
+        if getattr(self, 'overlay', None) is None:
+            from rover_overlay import PerformanceOverlay
+            self.overlay = PerformanceOverlay(queue_depth=self.queue_depth, status=self.status_report,
+                                              opacity=0)
+            self.overlay.pos = (0, Window.height - self.overlay.height)
+            Window.add_widget(self.overlay)
+        if self.overlay.active:
+            self.overlay.hide()
+        else:
+            self.overlay.show()
+    
+    def status_report(self):
+        """Telemetry rate and store lines for the performance overlay"""
+        return self.rates.report() + "\n" + self.store.report()
+    
+    def queue_depth(self):
+        """Commands queued or being written across every transport"""
+        depth = 0
+        if self.root.has_screen('android_control'):
+            depth += self.root.get_screen('android_control').transport.in_flight
+        if self.root.has_screen('fleet_control'):
+            depth += sum(rover.transport.in_flight
+                         for rover in self.root.get_screen('fleet_control').fleet.rovers.values())
+        return depth
+    
+    def export_metrics(self):
+        """Write the profiler's timers and counters to a JSON file"""
+        from kivy.uix.popup import Popup
+        try:
+            path = PROFILER.export(os.path.join(self.user_data_dir, 'metrics'))
+            message = f"Saved metrics to\n{path}"
+        except OSError as e:
+            message = f"Export failed:\n{str(e)}"
+        Popup(title="Metrics Export", content=Label(text=message), size_hint=(0.8, 0.4)).open()
+    
+    def on_start(self):
+        Clock.schedule_once(self._on_first_frame, 0)
+        Clock.schedule_interval(lambda dt: self.rates.update(), RATE_UPDATE_INTERVAL)
+        
+        # ROVER_REPLAY=<file.rvs> plays a recorded session through the screens
+        replay_path = os.environ.get('ROVER_REPLAY')
+        if replay_path:
+            self.replay(replay_path, speed=float(os.environ.get('ROVER_REPLAY_SPEED', '1')))
+    
+    def replay(self, path, speed=1.0):
+        """Feed a session recording into the shared telemetry parser"""
+        # Replayed frames are not new readings; keep them out of the history
+        self.telemetry.remove_listener(FRAME_CLIMATE, self.store.on_climate)
+        self.telemetry.remove_listener(FRAME_DISTANCE, self.store.on_distance)
+        self.player = SessionPlayer(
+            path,
+            parser=self.telemetry,
+            on_command=lambda data, timestamp: print(f"Replay: recorded {data!r}"),
+            on_event=lambda text, timestamp: print(f"Replay: {text}"),
+            on_finished=lambda player: print(f"Replay finished: {player.records} records"),
+            speed=speed
+        )
+        self.player.start()
+    
+    def on_replay_command(self, command):
+        """Command from a controller running against a replayed session"""
+        print(f"Replay: controller sent {command!r}")
+    
+    def _on_first_frame(self, dt):
+        self.startup_times['first_frame'] = time.perf_counter() - IMPORT_START
+        print("Startup: imports {imports:.0f} ms, build {build:.0f} ms, "
+              "first frame {first_frame:.0f} ms".format(
+                  **{key: value * 1000 for key, value in self.startup_times.items()}))
+        if self.prewarm_screens:
+            Clock.schedule_once(self._prewarm_next, self.prewarm_delay)
+    
+    def _prewarm_next(self, dt):
+        # One screen per frame keeps each pre-warm step below a frame budget
+        for name in self.screen_factories:
+            if not self.root.has_screen(name):
+                self.ensure_screen(name)
+                Clock.schedule_once(self._prewarm_next, 0)
+                return
+        print("Pre-warm: " + ", ".join(f"{name} {seconds * 1000:.0f} ms"
+                                        for name, seconds in self.screen_build_times.items()))
+    
+    def known_rover_cache(self):
+        """Rovers seen in earlier scans, shared by the control and fleet screens"""
+        if self.known_rovers is None:
+            self.known_rovers = KnownRovers(os.path.join(self.user_data_dir, 'known_rovers.json'))
+        return self.known_rovers
+    
+    def ensure_screen(self, name):
+        """Return the named screen, building it on first use"""
+        if not self.root.has_screen(name):
+            start = time.perf_counter()
+            self.root.add_widget(self.screen_factories[name](telemetry=self.telemetry))
+            self.screen_build_times[name] = time.perf_counter() - start
+        return self.root.get_screen(name)
+    
+    def on_stop(self):
+        # Release the Bluetooth socket when the app exits
+        if self.root.has_screen('android_control'):
+            control = self.root.get_screen('android_control')
+            control.transport.stop()
+            control.log.close_session()
+            control.close_recording()
+        if self.player is not None:
+            self.player.stop()
+        if self.root.has_screen('fleet_control'):
+            self.root.get_screen('fleet_control').fleet.stop()
+        self.store.stop()
 
 if __name__ == '__main__':
     SmartRoverApp().run()
\ No newline at end of file
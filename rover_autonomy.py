@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Smart Rover - Obstacle Avoidance
+Filters ultrasonic distance frames and drives the rover around obstacles
+"""
+
+import threading
+import time
+from collections import deque
+
+from rover_metrics import LatencyWindow
+
+# Avoidance states
+STATE_IDLE = 'idle'
+STATE_CRUISE = 'cruise'
+STATE_REVERSE = 'reverse'
+STATE_TURN = 'turn'
+
+DEFAULT_SAFE_DISTANCE = 30      # cm
+LATENCY_TARGET = 0.030          # seconds, sensor frame to queued command
+
+
+class DistanceFilter:
+    """Median of the last `window` readings smoothed with an EMA
+
+    The median rejects the single-sample spikes the HC-SR04 produces on
+    soft or angled surfaces; the EMA smooths what is left.
+    """
+
+    def __init__(self, window=5, alpha=0.5):
+        self.window = window
+        self.alpha = alpha
+        self.value = None
+        self._recent = deque(maxlen=window)
+
+    def reset(self):
+        self.value = None
+        self._recent.clear()
+
+    def update(self, distance):
+        self._recent.append(distance)
+        median = sorted(self._recent)[len(self._recent) // 2]
+        if self.value is None:
+            self.value = float(median)
+        else:
+            self.value += self.alpha * (median - self.value)
+        return self.value
+
+
+class ObstacleAvoider:
+    """Distance-driven state machine issuing F/L/R/B/S commands
+
+    `on_distance` is registered as a telemetry listener and runs on the
+    reader thread, so a command is queued within the same call that parsed
+    the frame. Commands are only sent when they change. `loop_latency`
+    records the time spent per frame and `sensor_latency` the time from
+    frame parse to command queued. State changes and sends are serialised
+    with a lock, so nothing but S goes out once stop() has run on the UI
+    thread.
+
+    Replayed frames carry their recorded times rather than time.monotonic(),
+    so with `start(live=False)` sensor latency is measured from when the
+    frame reached the listener instead.
+    """
+
+    def __init__(self, send, safe_distance=DEFAULT_SAFE_DISTANCE, clear_margin=10,
+                 reverse_time=0.4, turn_time=0.5, stale_timeout=0.5):
+        self.send = send
+        self.safe_distance = safe_distance
+        self.clear_margin = clear_margin
+        self.reverse_time = reverse_time
+        self.turn_time = turn_time
+        self.stale_timeout = stale_timeout
+
+        self.filter = DistanceFilter()
+        self.loop_latency = LatencyWindow()
+        self.sensor_latency = LatencyWindow()
+        self.state = STATE_IDLE
+        self.command = None
+        self.avoidances = 0
+
+        self._state_since = 0.0
+        self._last_frame = 0.0
+        self._turn_left = False
+        self._live = True
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self.state != STATE_IDLE
+
+    def start(self, live=True):
+        """Begin autonomous driving; `live` is False when frames are replayed"""
+        with self._lock:
+            self._live = live
+            self.filter.reset()
+            self.loop_latency.reset()
+            self.sensor_latency.reset()
+            self.command = None
+            self._last_frame = time.monotonic()
+            # The first distance frame starts the state clock
+            self._enter(STATE_CRUISE, None)
+
+    def stop(self):
+        """Stop driving and halt the rover"""
+        with self._lock:
+            self.state = STATE_IDLE
+            self._issue('S')
+
+    def check_stale(self):
+        """Halt if distance frames stopped arriving; call from a UI timer"""
+        with self._lock:
+            if self.running and time.monotonic() - self._last_frame > self.stale_timeout:
+                if self.command != 'S':
+                    self._issue('S')
+                return True
+            return False
+
+    def on_distance(self, values, timestamp):
+        """Telemetry listener for FRAME_DISTANCE"""
+        if not self.running:
+            return
+        with self._lock:
+            if not self.running:
+                return
+            start = time.monotonic()
+            self._last_frame = start
+            distance = self.filter.update(values[0])
+            # State timing follows frame time so recorded sessions replay identically
+            command = self._step(distance, timestamp)
+            if command != self.command:
+                self._issue(command)
+                self.sensor_latency.add(time.monotonic() - (timestamp if self._live else start))
+            self.loop_latency.add(time.monotonic() - start)
+
+    def _enter(self, state, now):
+        self.state = state
+        self._state_since = now
+
+    def _step(self, distance, now):
+        if self._state_since is None:
+            self._state_since = now
+        elapsed = now - self._state_since
+
+        if self.state == STATE_CRUISE:
+            if distance < self.safe_distance:
+                self.avoidances += 1
+                self._enter(STATE_REVERSE, now)
+                return 'B'
+            return 'F'
+
+        if self.state == STATE_REVERSE:
+            if elapsed < self.reverse_time:
+                return 'B'
+            self._enter(STATE_TURN, now)
+            self._turn_left = not self._turn_left
+            return 'L' if self._turn_left else 'R'
+
+        if self.state == STATE_TURN:
+            turn = 'L' if self._turn_left else 'R'
+            if elapsed < self.turn_time or distance < self.safe_distance + self.clear_margin:
+                return turn
+            self._enter(STATE_CRUISE, now)
+            return 'F'
+
+        return 'S'
+
+    def _issue(self, command):
+        # Called with the lock held; a stopped avoider only ever sends S
+        if self.state == STATE_IDLE and command != 'S':
+            return
+        self.command = command
+        self.send(command)
+
+    def report(self):
+        """Human-readable loop and sensor-to-command latency percentiles"""
+        loop_p50, loop_p99 = self.loop_latency.percentiles(50, 99)
+        sensor_p50, sensor_p99 = self.sensor_latency.percentiles(50, 99)
+        if loop_p50 is None:
+            return "Loop: no data"
+        text = f"Loop p50/p99: {loop_p50 * 1000:.2f} / {loop_p99 * 1000:.2f} ms"
+        if sensor_p50 is not None:
+            within = "OK" if sensor_p99 <= LATENCY_TARGET else "over budget"
+            text += (f"\nSensor->cmd p50/p99: {sensor_p50 * 1000:.1f} / "
+                     f"{sensor_p99 * 1000:.1f} ms ({within})")
+        return text
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Smart Rover - Live Chart Widget
+Canvas line plot of a TimeSeries column with per-pixel min/max decimation
+"""
+
+import time
+
+from kivy.clock import Clock
+from kivy.graphics import Color, Line, Rectangle
+from kivy.properties import ColorProperty, NumericProperty, ObjectProperty
+from kivy.uix.widget import Widget
+
+from rover_metrics import PROFILER
+
+DEFAULT_FPS = 60
+
+
+class LiveChart(Widget):
+    """Plots the newest samples of one TimeSeries column
+
+    The chart polls the series at most `fps` times a second while started
+    and only redraws when new samples arrived or the widget moved. Each
+    redraw reduces the visible window to one min/max pair per horizontal
+    pixel, so the cost depends on widget width, not on sample rate. Points
+    are written into a reused list and pushed to a single Line instruction.
+
+    The settings are Kivy properties so charts can be declared in KV rules;
+    `lock`, when set, is held while the window is copied out.
+    """
+
+    series = ObjectProperty(None, allownone=True)
+    column = NumericProperty(0)
+    window = NumericProperty(300)
+    y_range = ObjectProperty(None, allownone=True)
+    fps = NumericProperty(DEFAULT_FPS)
+    line_color = ColorProperty((0.2, 0.6, 0.9, 1))
+    lock = ObjectProperty(None, allownone=True)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.redraws = 0
+        self._points = []
+        self._seen = None
+        self._event = None
+        self._geometry_dirty = True
+
+        with self.canvas:
+            Color(0.12, 0.12, 0.12, 1)
+            self._background = Rectangle()
+            self._color = Color(rgba=self.line_color)
+            self._line = Line(points=[], width=1.2)
+
+        self.bind(pos=self._on_geometry, size=self._on_geometry,
+                  series=self._on_source, window=self._on_source, column=self._on_source,
+                  line_color=self._on_line_color)
+        self._on_geometry()
+
+    def start(self):
+        """Begin polling the series at the chart frame rate"""
+        if self._event is None:
+            self._event = Clock.schedule_interval(self._poll, 1. / self.fps)
+
+    def stop(self):
+        """Stop polling, e.g. when the screen is hidden"""
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def set_series(self, series, window=None, lock=None):
+        """Plot another series, e.g. switching between live and history views"""
+        self.lock = lock
+        if window is not None:
+            self.window = window
+        self.series = series
+
+    def _on_source(self, *args):
+        self._seen = None
+
+    def _on_line_color(self, instance, color):
+        self._color.rgba = color
+
+    def _on_geometry(self, *args):
+        self._background.pos = self.pos
+        self._background.size = self.size
+        self._geometry_dirty = True
+
+    def _poll(self, dt):
+        series = self.series
+        if series is None:
+            return
+        if series.appended == self._seen and not self._geometry_dirty:
+            return
+        self._seen = series.appended
+        self._geometry_dirty = False
+        if PROFILER.enabled:
+            start = time.perf_counter()
+        self.redraw()
+        if PROFILER.enabled:
+            PROFILER.record('ui.chart_redraw', time.perf_counter() - start)
+
+    def redraw(self):
+        """Rebuild the line from the current window of samples"""
+        if self.lock is not None:
+            with self.lock:
+                values = self.series.window(self.column, self.window)
+        else:
+            values = self.series.window(self.column, self.window)
+
+        count = len(values)
+        width = int(self.width)
+        if count < 2 or width < 2:
+            self._line.points = []
+            return
+
+        if self.y_range:
+            low, high = self.y_range
+        else:
+            low, high = min(values), max(values)
+        if high - low < 1e-6:
+            low -= 1.
+            high += 1.
+        x0, y0 = self.x, self.y
+        y_scale = (self.height - 2) / (high - low)
+        y_base = y0 + 1 - low * y_scale
+
+        if count <= width:
+            # Fewer samples than pixels: plot every sample
+            needed = count * 2
+            points = self._buffer(needed)
+            x_step = (width - 1) / (count - 1)
+            for i in range(count):
+                points[2 * i] = x0 + i * x_step
+                points[2 * i + 1] = y_base + values[i] * y_scale
+        else:
+            # One vertical min/max stroke per pixel column
+            needed = width * 4
+            points = self._buffer(needed)
+            per_column = count / width
+            for column in range(width):
+                start = int(column * per_column)
+                stop = int((column + 1) * per_column)
+                chunk = values[start:stop]
+                x = x0 + column
+                j = column * 4
+                points[j] = x
+                points[j + 1] = y_base + min(chunk) * y_scale
+                points[j + 2] = x
+                points[j + 3] = y_base + max(chunk) * y_scale
+
+        self._line.points = points
+        self.redraws += 1
+
+    def _buffer(self, size):
+        if len(self._points) != size:
+            self._points = [0.0] * size
+        return self._points
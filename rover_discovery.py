@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Smart Rover - Bluetooth Discovery
+Asynchronous HC-05 discovery through BluetoothAdapter.startDiscovery and a
+persistent cache of rovers seen before
+"""
+
+import json
+import os
+import threading
+import time
+
+from rover_transport import kivy_dispatch, detach_jvm_thread
+
+# Only devices whose name contains one of these are offered as rovers
+ROVER_NAME_TAGS = ('HC-05', 'HC-06')
+
+# Value Android reports when a discovery result carries no RSSI
+RSSI_UNKNOWN = -32768
+
+# Devices offered by the desktop stand-in for discovery: (MAC, name, RSSI, delay)
+SIMULATED_DEVICES = (
+    ('00:00:00:00:05:01', 'HC-05 (Simulated)', -48, 0.2),
+    ('00:00:00:00:06:01', 'HC-06 (Simulated)', -71, 0.6),
+    ('00:00:00:00:05:02', 'HC-05 (Simulated)', -80, 1.0),
+)
+
+
+def is_rover_name(name, tags=ROVER_NAME_TAGS):
+    return bool(name) and any(tag in name for tag in tags)
+
+
+def device_label(name, address, rssi=None):
+    """Spinner text for a device; the MAC tail tells identically named modules apart"""
+    label = f"{name} [{address[-5:]}]"
+    if rssi is not None:
+        label += f" {rssi} dBm"
+    return label
+
+
+def device_entries(discovered, known):
+    """Spinner label -> (name, address): discovered rovers by signal, then known ones
+
+    `discovered` maps MAC -> (name, rssi); `known` is KnownRovers.recent().
+    """
+    entries = {}
+    ordered = sorted(discovered.items(),
+                     key=lambda item: -999 if item[1][1] is None else -item[1][1])
+    for address, (name, rssi) in ordered:
+        entries[device_label(name, address, rssi)] = (name, address)
+    for address, name, rssi in known:
+        if address not in discovered:
+            entries[device_label(name, address)] = (name, address)
+    return entries
+
+
+class KnownRovers:
+    """Rovers seen in earlier scans, kept in a small JSON file
+
+    Loaded when the control screen is built so the device list is filled
+    before any scan runs. Entries are keyed by MAC address. `devices` is
+    only touched under `_lock`, which `save` holds just long enough to take
+    a snapshot, so the UI thread never waits on the file write.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.devices = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                devices = json.load(f)
+        except (OSError, ValueError):
+            devices = {}
+        with self._lock:
+            self.devices = devices if isinstance(devices, dict) else {}
+
+    def update(self, address, name, rssi=None):
+        with self._lock:
+            entry = self.devices.setdefault(address, {})
+            entry['name'] = name
+            if rssi is not None:
+                entry['rssi'] = rssi
+            entry['last_seen'] = time.time()
+
+    def save(self):
+        """Write the cache atomically; safe to call from a background thread"""
+        with self._write_lock:
+            with self._lock:
+                data = json.dumps(self.devices, indent=1)
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(temp_path, self.path)
+
+    def save_in_background(self):
+        """Save on a short-lived thread so the UI never waits on storage"""
+        threading.Thread(target=self._save_logged, name='known-rovers', daemon=True).start()
+
+    def _save_logged(self):
+        try:
+            self.save()
+        except OSError as e:
+            print(f"Known rover cache not saved: {e}")
+
+    def recent(self):
+        """(address, name, rssi) tuples, most recently seen first"""
+        with self._lock:
+            ordered = sorted(self.devices.items(), key=lambda item: item[1].get('last_seen', 0),
+                             reverse=True)
+            return [(address, entry.get('name', address), entry.get('rssi'))
+                    for address, entry in ordered]
+
+
+class DeviceDiscovery:
+    """Streams nearby rovers to `on_device(address, name, rssi)` as they are found
+
+    On Android, bonded devices are listed on a background thread while
+    `startDiscovery` runs; ACTION_FOUND broadcasts arrive on the broadcast
+    receiver's thread. Results are de-duplicated by MAC (a repeat is only
+    reported when its name or RSSI changed) and delivered through
+    `dispatch`, Clock.schedule_once by default. `on_finished(count)` fires
+    when discovery completes or is stopped. On desktop a short simulated
+    scan stands in for the radio.
+    """
+
+    def __init__(self, on_device, on_finished=None, dispatch=None, name_tags=ROVER_NAME_TAGS):
+        self.on_device = on_device
+        self.on_finished = on_finished
+        self.dispatch = dispatch or kivy_dispatch
+        self.name_tags = name_tags
+        self.devices = {}
+        self.running = False
+        self._adapter = None
+        self._receiver = None
+        self._cancel = threading.Event()
+
+    def start(self):
+        """Begin discovery; raises if Bluetooth is unavailable"""
+        if self.running:
+            return
+        self.devices = {}
+        self._cancel.clear()
+        self.running = True
+        try:
+            from jnius import autoclass  # noqa: F401
+            from android.broadcast import BroadcastReceiver  # noqa: F401
+        except ImportError:
+            threading.Thread(target=self._simulate, name='rover-discovery', daemon=True).start()
+            return
+        try:
+            self._start_android()
+        except Exception:
+            self._teardown()
+            self.running = False
+            raise
+
+    def stop(self):
+        """Cancel discovery, e.g. before connecting (discovery slows RFCOMM connects)"""
+        if self.running:
+            self._finish()
+
+    # Android
+
+    def _start_android(self):
+        from jnius import autoclass
+        from android.broadcast import BroadcastReceiver
+        BluetoothAdapter = autoclass('android.bluetooth.BluetoothAdapter')
+        BluetoothDevice = autoclass('android.bluetooth.BluetoothDevice')
+
+        adapter = BluetoothAdapter.getDefaultAdapter()
+        if adapter is None or not adapter.isEnabled():
+            raise RuntimeError("Please enable Bluetooth first!")
+        self._adapter = adapter
+        self._action_found = BluetoothDevice.ACTION_FOUND
+        self._action_finished = BluetoothAdapter.ACTION_DISCOVERY_FINISHED
+        self._extra_device = BluetoothDevice.EXTRA_DEVICE
+        self._extra_rssi = BluetoothDevice.EXTRA_RSSI
+
+        self._receiver = BroadcastReceiver(self._on_broadcast,
+                                           actions=[self._action_found, self._action_finished])
+        self._receiver.start()
+        threading.Thread(target=self._list_bonded, args=(adapter,), name='rover-bonded',
+                         daemon=True).start()
+        if adapter.isDiscovering():
+            adapter.cancelDiscovery()
+        if not adapter.startDiscovery():
+            raise RuntimeError("Bluetooth discovery could not start")
+
+    def _list_bonded(self, adapter):
+        try:
+            for device in adapter.getBondedDevices().toArray():
+                if self._cancel.is_set():
+                    break
+                self._accept(device.getAddress(), device.getName(), None)
+        except Exception as e:
+            print(f"Bonded device list unavailable: {e}")
+        finally:
+            detach_jvm_thread()
+
+    def _on_broadcast(self, context, intent):
+        # Broadcast receiver thread
+        from jnius import cast
+        action = intent.getAction()
+        if action == self._action_found:
+            device = cast('android.bluetooth.BluetoothDevice',
+                          intent.getParcelableExtra(self._extra_device))
+            rssi = intent.getShortExtra(self._extra_rssi, RSSI_UNKNOWN)
+            self._accept(device.getAddress(), device.getName(),
+                         None if rssi == RSSI_UNKNOWN else rssi)
+        elif action == self._action_finished and self.running:
+            self._finish()
+
+    # Desktop
+
+    def _simulate(self):
+        started = time.monotonic()
+        for address, name, rssi, delay in SIMULATED_DEVICES:
+            if self._cancel.wait(max(0.0, started + delay - time.monotonic())):
+                return
+            self._accept(address, name, rssi)
+        if self.running:
+            self._finish()
+
+    # Any thread
+
+    def _accept(self, address, name, rssi):
+        if not address or not is_rover_name(name, self.name_tags):
+            return
+        previous = self.devices.get(address)
+        if previous is not None:
+            # Bonded entries carry no RSSI; keep the one discovery reported
+            if rssi is None:
+                rssi = previous[1]
+            if previous == (name, rssi):
+                return
+        self.devices[address] = (name, rssi)
+        self.dispatch(self.on_device, address, name, rssi)
+
+    def _finish(self):
+        self.running = False
+        self._cancel.set()
+        self._teardown()
+        if self.on_finished:
+            self.dispatch(self.on_finished, len(self.devices))
+
+    def _teardown(self):
+        adapter, self._adapter = self._adapter, None
+        receiver, self._receiver = self._receiver, None
+        try:
+            if adapter is not None and adapter.isDiscovering():
+                adapter.cancelDiscovery()
+        except Exception as e:
+            print(f"Cancel discovery failed: {e}")
+        if receiver is not None:
+            receiver.stop()
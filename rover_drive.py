@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Smart Rover - Hold-to-Drive Scheduler
+Re-sends the held direction at a fixed rate without backing up the HC-05 link
+"""
+
+import time
+
+STOP_COMMAND = 'S'
+
+# Default repeat rate and limits for the 8051 UART
+DEFAULT_RATE_HZ = 20
+MIN_RATE_HZ = 10
+MAX_RATE_HZ = 50
+DEFAULT_DEADMAN_TIMEOUT = 0.5
+DEFAULT_MAX_IN_FLIGHT = 1
+
+
+class DriveScheduler:
+    """Clock-driven repeater for the active drive direction
+
+    While a direction is held it is re-sent every 1/rate_hz seconds, but a
+    tick is skipped whenever `max_in_flight` commands are still waiting on
+    the transport, so queued latency never grows beyond one write. Releasing
+    sends Stop. The deadman trips (and sends Stop) when ticks stall or the
+    transport stops draining for `deadman_timeout` seconds.
+    """
+
+    def __init__(self, transport, rate_hz=DEFAULT_RATE_HZ, deadman_timeout=DEFAULT_DEADMAN_TIMEOUT,
+                 max_in_flight=DEFAULT_MAX_IN_FLIGHT, on_deadman=None, clock=None):
+        self.transport = transport
+        self.deadman_timeout = deadman_timeout
+        self.max_in_flight = max_in_flight
+        self.on_deadman = on_deadman
+        self.active = None
+        self.sent = 0
+        self.skipped = 0
+
+        if clock is None:
+            from kivy.clock import Clock as clock
+        self._clock = clock
+        self._event = None
+        self._last_tick = 0.0
+        self._last_drain = 0.0
+        self.rate_hz = rate_hz
+
+    @property
+    def rate_hz(self):
+        return self._rate_hz
+
+    @rate_hz.setter
+    def rate_hz(self, value):
+        self._rate_hz = max(MIN_RATE_HZ, min(MAX_RATE_HZ, value))
+        if self._event is not None:
+            self._event.cancel()
+            self._event = self._clock.schedule_interval(self._tick, 1. / self._rate_hz)
+
+    def press(self, direction):
+        """Start holding a direction, sending it immediately"""
+        if direction == STOP_COMMAND:
+            self.release()
+            return
+        now = time.monotonic()
+        self.active = direction
+        self._last_tick = now
+        self._last_drain = now
+        self._send(direction)
+        if self._event is None:
+            self._event = self._clock.schedule_interval(self._tick, 1. / self._rate_hz)
+
+    def release(self):
+        """Stop repeating and send Stop"""
+        self._cancel()
+        self.active = None
+        # Stop bypasses the in-flight limit
+        if self.transport.send(STOP_COMMAND):
+            self.sent += 1
+
+    def _cancel(self):
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def _send(self, command):
+        if self.transport.send(command):
+            self.sent += 1
+
+    def _tick(self, dt):
+        if self.active is None:
+            self._cancel()
+            return False
+
+        now = time.monotonic()
+        stalled = now - self._last_tick > self.deadman_timeout
+        self._last_tick = now
+
+        if self.transport.in_flight < self.max_in_flight:
+            self._last_drain = now
+        elif now - self._last_drain > self.deadman_timeout:
+            stalled = True
+
+        if stalled:
+            direction = self.active
+            self.release()
+            if self.on_deadman:
+                self.on_deadman(direction)
+            return False
+
+        if self.transport.in_flight >= self.max_in_flight:
+            self.skipped += 1
+            return
+        self._send(self.active)
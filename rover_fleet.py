@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Smart Rover - Fleet Control
+Keeps one transport worker per rover so a single phone can drive several HC-05 rovers
+"""
+
+import threading
+import time
+
+from rover_telemetry import TelemetryParser
+from rover_transport import TransportWorker, STATE_CONNECTED, STATE_DISCONNECTED
+
+# Group every rover belongs to
+GROUP_ALL = 'all'
+
+
+def direct_dispatch(callback, *args):
+    """Run callback on the calling (worker) thread"""
+    callback(*args)
+
+
+class FleetRover:
+    """One rover: its link, transport worker, telemetry parser and status"""
+
+    def __init__(self, rover_id, link, transport, telemetry):
+        self.rover_id = rover_id
+        self.link = link
+        self.transport = transport
+        self.telemetry = telemetry
+        self.state = STATE_DISCONNECTED
+        self.detail = None
+        self.commands_sent = 0
+        self.errors = 0
+        self.last_command = None
+        self.changed_at = time.monotonic()
+
+    @property
+    def connected(self):
+        return self.state == STATE_CONNECTED
+
+
+class FleetManager:
+    """Connection manager for N concurrent rover links
+
+    Each rover gets its own TransportWorker (I/O thread, command queue,
+    telemetry reader and reconnect loop), so a stalled link only delays
+    its own rover. Broadcast and group sends are one non-blocking enqueue
+    per rover; `all_stop` uses urgent sends, which replace whatever each
+    worker still has queued and go out as a single write per link.
+
+    Worker callbacks run directly on the worker threads and only update
+    the rover's status record. The UI polls `changes()` on its own timer
+    and redraws just the rovers whose status moved, so UI work per frame
+    does not grow with the number of rovers or the rate of link events.
+
+    The rover and group tables are only changed by the thread that owns
+    the fleet (the UI thread); worker threads just look rovers up.
+    """
+
+    def __init__(self, **worker_options):
+        self.worker_options = worker_options
+        self.rovers = {}
+        self.groups = {GROUP_ALL: []}
+        self._changed = set()
+        self._lock = threading.Lock()
+
+    def add(self, rover_id, link, groups=()):
+        """Start a worker for `rover_id` and connect it over `link`"""
+        if rover_id in self.rovers:
+            raise ValueError(f"Rover {rover_id} already in the fleet")
+        telemetry = TelemetryParser()
+        transport = TransportWorker(
+            on_state=lambda state, detail: self._on_state(rover_id, state, detail),
+            on_result=lambda commands, error: self._on_result(rover_id, commands, error),
+            dispatch=direct_dispatch,
+            telemetry=telemetry,
+            name=f'rover-transport-{rover_id}',
+            **self.worker_options
+        )
+        rover = FleetRover(rover_id, link, transport, telemetry)
+        with self._lock:
+            self.rovers[rover_id] = rover
+            self._changed.add(rover_id)
+        self.groups[GROUP_ALL].append(rover_id)
+        for group in groups:
+            self.join(group, rover_id)
+        transport.start()
+        transport.connect(link)
+        return rover
+
+    def remove(self, rover_id, background=False):
+        """Drop a rover from the fleet and stop its worker
+
+        With `background` the worker is stopped (and its link closed) on a
+        separate thread, so a stalled link never blocks the caller; the
+        rover leaves the tables immediately either way.
+        """
+        rover = self.rovers.pop(rover_id, None)
+        if rover is None:
+            return None
+        for members in self.groups.values():
+            if rover_id in members:
+                members.remove(rover_id)
+        with self._lock:
+            self._changed.add(rover_id)
+        if background:
+            threading.Thread(target=rover.transport.stop, name=f'fleet-remove-{rover_id}',
+                             daemon=True).start()
+        else:
+            rover.transport.stop()
+        return rover
+
+    def join(self, group, rover_id):
+        """Add a rover to a named group"""
+        members = self.groups.setdefault(group, [])
+        if rover_id not in members:
+            members.append(rover_id)
+
+    def leave(self, group, rover_id):
+        """Remove a rover from a named group"""
+        members = self.groups.get(group, [])
+        if rover_id in members and group != GROUP_ALL:
+            members.remove(rover_id)
+
+    def send(self, rover_id, command, urgent=False):
+        """Queue a command for one rover, returns False when it was rejected"""
+        rover = self.rovers.get(rover_id)
+        if rover is None:
+            return False
+        return rover.transport.send(command, urgent=urgent)
+
+    def send_group(self, group, command, urgent=False):
+        """Queue a command for every rover in `group`, returns how many accepted it"""
+        accepted = 0
+        for rover_id in self.groups.get(group, ()):
+            if self.send(rover_id, command, urgent=urgent):
+                accepted += 1
+        return accepted
+
+    def broadcast(self, command, urgent=False):
+        """Queue a command for the whole fleet"""
+        return self.send_group(GROUP_ALL, command, urgent=urgent)
+
+    def all_stop(self):
+        """Stop every rover now, dropping anything still queued"""
+        return self.broadcast('S', urgent=True)
+
+    def changes(self):
+        """Rovers whose status changed since the last call"""
+        with self._lock:
+            changed, self._changed = self._changed, set()
+        return [self.rovers[rover_id] for rover_id in changed if rover_id in self.rovers]
+
+    def connected_count(self):
+        return sum(1 for rover in self.rovers.values() if rover.connected)
+
+    def stop(self):
+        """Stop every worker, closing all links"""
+        for rover in list(self.rovers.values()):
+            rover.transport.stop()
+        self.rovers.clear()
+        self.groups = {GROUP_ALL: []}
+
+    # Worker threads
+
+    def _on_state(self, rover_id, state, detail):
+        rover = self.rovers.get(rover_id)
+        if rover is None:
+            return
+        rover.state = state
+        rover.detail = detail
+        rover.changed_at = time.monotonic()
+        with self._lock:
+            self._changed.add(rover_id)
+
+    def _on_result(self, rover_id, commands, error):
+        rover = self.rovers.get(rover_id)
+        if rover is None:
+            return
+        if error:
+            rover.errors += 1
+        else:
+            rover.commands_sent += len(commands)
+            rover.last_command = commands[-1]
+        with self._lock:
+            self._changed.add(rover_id)
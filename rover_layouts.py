@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Smart Rover - Screen Layouts
+KV rules for every screen's widget tree; the screen classes only hold behaviour
+"""
+
+from kivy.factory import Factory
+from kivy.lang import Builder
+
+import rover_widgets  # noqa: F401  (Panel, ScreenHeader, Readout, DirectionPad rules)
+
+# Registered by module name so rover_chart is only imported with the first chart
+Factory.register('LiveChart', module='rover_chart')
+
+# Parsed once at import. Widgets the code updates carry an id and are
+# picked up from `ids` by the screen; everything else is static. Rows are
+# a single BoxLayout level under each screen's Panel.
+KV = '''
+#:import DEFAULT_SAFE_DISTANCE rover_autonomy.DEFAULT_SAFE_DISTANCE
+
+<Row@BoxLayout>:
+    size_hint_y: None
+    height: '40dp'
+    spacing: 10
+
+<ModeButton@Button>:
+    size_hint_y: None
+    height: '80dp'
+    font_size: '16sp'
+
+<ModeSelectionScreen>:
+    Panel:
+        padding: 20
+        spacing: 15
+        Label:
+            text: 'Smart Rover Control'
+            font_size: '24sp'
+            size_hint_y: None
+            height: '60dp'
+            color: 0.9, 0.9, 0.9, 1
+        Label:
+            text: '8051 Microcontroller - HC-05 Bluetooth'
+            font_size: '14sp'
+            size_hint_y: None
+            height: '40dp'
+            color: 0.7, 0.7, 0.7, 1
+        ScrollView:
+            BoxLayout:
+                orientation: 'vertical'
+                spacing: 15
+                size_hint_y: None
+                height: self.minimum_height
+                ModeButton:
+                    text: 'Android Control'
+                    background_color: 0.2, 0.6, 0.9, 1
+                    on_press: root.go_to_mode('android_control')
+                ModeButton:
+                    text: 'Obstacle Detection'
+                    background_color: 0.9, 0.5, 0.1, 1
+                    on_press: root.go_to_mode('obstacle_detection')
+                ModeButton:
+                    text: 'Line Follower'
+                    background_color: 0.6, 0.3, 0.7, 1
+                    on_press: root.go_to_mode('line_follower')
+                ModeButton:
+                    text: 'Temperature & Humidity'
+                    background_color: 0.1, 0.7, 0.4, 1
+                    on_press: root.go_to_mode('sensor_monitoring')
+                ModeButton:
+                    text: 'Fleet Control'
+                    background_color: 0.2, 0.5, 0.5, 1
+                    on_press: root.go_to_mode('fleet_control')
+        Row:
+            Button:
+                text: 'Perf Overlay'
+                background_color: 0.4, 0.4, 0.4, 1
+                on_press: app.toggle_overlay()
+            Button:
+                text: 'Export Metrics'
+                background_color: 0.4, 0.4, 0.4, 1
+                on_press: app.export_metrics()
+
+<AndroidControlScreen>:
+    Panel:
+        ScreenHeader:
+            title: 'Android Control Mode'
+        Row:
+            spacing: 0
+            Label:
+                text: 'HC-05 Device:'
+                size_hint_x: None
+                width: '100dp'
+            Spinner:
+                id: device_spinner
+                text: 'Select Device'
+                values: ['Scan for devices...']
+                size_hint_x: 0.6
+                on_text: root.on_device_select(self, self.text)
+            Button:
+                text: 'Scan'
+                size_hint_x: None
+                width: '60dp'
+                background_color: 0.2, 0.6, 0.9, 1
+                on_press: root.scan_devices(self)
+        Row:
+            Button:
+                id: connect_btn
+                text: 'Connect'
+                background_color: 0.1, 0.7, 0.1, 1
+                on_press: root.connect_bluetooth(self)
+            Button:
+                id: disconnect_btn
+                text: 'Disconnect'
+                background_color: 0.8, 0.2, 0.2, 1
+                disabled: True
+                on_press: root.disconnect_bluetooth(self)
+        Label:
+            id: status_label
+            text: 'Status: Disconnected'
+            size_hint_y: None
+            height: '40dp'
+            color: 0.8, 0.2, 0.2, 1
+        Label:
+            text: 'Control Commands: F=Forward, L=Left, R=Right, B=Backward, S=Stop'
+            size_hint_y: None
+            height: '60dp'
+            halign: 'center'
+            color: 0.8, 0.8, 0.8, 1
+        Row:
+            spacing: 5
+            Spinner:
+                id: mission_spinner
+                text: 'Select Mission'
+                size_hint_x: 0.5
+            Button:
+                id: mission_btn
+                text: 'Run'
+                background_color: 0.1, 0.7, 0.1, 1
+                on_press: root.toggle_mission(self)
+            Button:
+                text: 'Edit'
+                background_color: 0.6, 0.6, 0.6, 1
+                on_press: root.edit_mission(self)
+        DirectionPad:
+            on_direction: root.start_drive(args[1])
+            on_direction_release: root.stop_drive()
+        Label:
+            text: 'Command Log:'
+            size_hint_y: None
+            height: '30dp'
+            color: 0.9, 0.9, 0.9, 1
+        ScrollView:
+            size_hint_y: 0.3
+            Label:
+                id: command_log
+                text: 'Ready to connect...'
+                halign: 'left'
+                valign: 'top'
+                color: 0.7, 0.7, 0.7, 1
+
+<ObstacleDetectionScreen>:
+    Panel:
+        padding: 20
+        spacing: 20
+        ScreenHeader:
+            title: 'Obstacle Detection'
+        Readout:
+            id: distance_label
+            text: 'Distance: -- cm'
+        LiveChart:
+            id: distance_chart
+            y_range: (0, 200)
+            line_color: 0.9, 0.5, 0.1, 1
+        Row:
+            spacing: 0
+            Label:
+                id: safe_label
+                text: 'Safe: %d cm' % DEFAULT_SAFE_DISTANCE
+                size_hint_x: None
+                width: '100dp'
+            Slider:
+                min: 10
+                max: 100
+                step: 5
+                value: DEFAULT_SAFE_DISTANCE
+                on_value: root.on_safe_distance(self, self.value)
+        Button:
+            id: auto_btn
+            text: 'Start Avoidance'
+            size_hint_y: None
+            height: '50dp'
+            background_color: 0.9, 0.5, 0.1, 1
+            on_press: root.toggle_avoidance(self)
+        Readout:
+            id: latency_label
+            text: 'Loop: no data'
+            font_size: '14sp'
+            height: '40dp'
+            color: 0.7, 0.7, 0.7, 1
+
+<GainInput@TextInput>:
+    multiline: False
+    input_filter: 'float'
+    size_hint_y: None
+    height: '40dp'
+
+<GainLabel@Label>:
+    size_hint_y: None
+    height: '25dp'
+
+<LineFollowerScreen>:
+    Panel:
+        padding: 20
+        spacing: 20
+        ScreenHeader:
+            title: 'Line Follower'
+        Readout:
+            id: ir_label
+            text: 'IR  L: --  C: --  R: --'
+        Readout:
+            id: position_label
+            text: 'Line position: --'
+            font_size: '16sp'
+            height: '40dp'
+            color: 0.7, 0.7, 0.7, 1
+        GridLayout:
+            cols: 3
+            spacing: 10
+            size_hint_y: None
+            height: '70dp'
+            GainLabel:
+                text: 'KP'
+            GainLabel:
+                text: 'KI'
+            GainLabel:
+                text: 'KD'
+            GainInput:
+                id: kp
+            GainInput:
+                id: ki
+            GainInput:
+                id: kd
+        Button:
+            id: follow_btn
+            text: 'Start Following'
+            size_hint_y: None
+            height: '50dp'
+            background_color: 0.6, 0.3, 0.7, 1
+            on_press: root.toggle_following(self)
+        Label:
+            text: 'Runs are recorded to linelogs/ for\\ntools/tune_line_follower.py'
+            font_size: '14sp'
+            halign: 'center'
+            color: 0.6, 0.6, 0.6, 1
+
+<SensorMonitoringScreen>:
+    Panel:
+        padding: 20
+        spacing: 20
+        ScreenHeader:
+            title: 'Sensor Monitor'
+        Readout:
+            id: climate_label
+            text: '-- \\u00b0C    -- %RH'
+        Readout:
+            id: stats_label
+            text: 'Last minute: no data'
+            font_size: '14sp'
+            height: '70dp'
+            color: 0.7, 0.7, 0.7, 1
+        Button:
+            id: range_btn
+            text: 'Show 24 h'
+            size_hint_y: None
+            height: '40dp'
+            background_color: 0.3, 0.5, 0.4, 1
+            on_press: root.toggle_range(self)
+        LiveChart:
+            id: temperature_chart
+            line_color: 0.9, 0.4, 0.2, 1
+        LiveChart:
+            id: humidity_chart
+            column: 1
+            line_color: 0.2, 0.6, 0.9, 1
+        Button:
+            text: 'Export CSV'
+            size_hint_y: None
+            height: '50dp'
+            background_color: 0.1, 0.7, 0.4, 1
+            on_press: root.export_csv(self)
+
+<FleetRoverRow>:
+    size_hint_y: None
+    height: '40dp'
+    spacing: 5
+    Label:
+        id: status
+        text: root.label + ': connecting'
+        halign: 'left'
+        color: 0.9, 0.7, 0.1, 1
+    ToggleButton:
+        text: 'Select'
+        size_hint_x: None
+        width: '70dp'
+        on_state: root.screen.select_rover(root.rover_id, self.state == 'down')
+    Button:
+        text: 'X'
+        size_hint_x: None
+        width: '40dp'
+        background_color: 0.6, 0.6, 0.6, 1
+        on_press: root.screen.remove_rover(root.rover_id)
+
+<FleetControlScreen>:
+    Panel:
+        ScreenHeader:
+            title: 'Fleet Control'
+        Row:
+            spacing: 5
+            Spinner:
+                id: device_spinner
+                text: 'Select Device'
+                size_hint_x: 0.7
+                on_text: root.on_device_select(self, self.text)
+            Button:
+                text: 'Add Rover'
+                background_color: 0.1, 0.7, 0.1, 1
+                on_press: root.add_rover(self)
+        Row:
+            spacing: 0
+            Label:
+                text: 'Send to:'
+                size_hint_x: None
+                width: '80dp'
+            Spinner:
+                id: target_spinner
+                text: 'All rovers'
+                values: ['All rovers', 'Selected rovers']
+        DirectionPad:
+            height: '180dp'
+            spacing: '5dp'
+            on_direction: root.send_group(args[1])
+            on_direction_release: root.send_group('S')
+        Button:
+            text: 'ALL STOP'
+            font_size: '20sp'
+            size_hint_y: None
+            height: '60dp'
+            background_color: 0.9, 0.1, 0.1, 1
+            on_press: root.all_stop(self)
+        Label:
+            id: summary_label
+            text: 'No rovers'
+            size_hint_y: None
+            height: '30dp'
+            color: 0.8, 0.8, 0.8, 1
+        ScrollView:
+            BoxLayout:
+                id: rover_layout
+                orientation: 'vertical'
+                spacing: 5
+                size_hint_y: None
+                height: self.minimum_height
+'''
+
+Builder.load_string(KV)
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Smart Rover - Line Follower
+Line position estimation, PID steering and batched offline gain replay
+"""
+
+import csv
+import threading
+
+# IR readings above this are treated as "on the line" (0-255 reflectance)
+DEFAULT_THRESHOLD = 128
+
+# Steering value mapped to one command per frame: -1 = full left, +1 = full right
+COMMAND_STEERING = {'L': -1.0, 'R': 1.0, 'F': 0.0, 'B': 0.0, 'S': 0.0}
+
+LOG_FIELDS = ('time', 'left', 'center', 'right', 'command')
+
+
+def estimate_line_position(left, center, right, threshold=DEFAULT_THRESHOLD):
+    """Weighted line position from the 3-sensor array
+
+    Returns -1.0 (line under the left sensor) .. +1.0 (under the right
+    sensor), or None when no sensor sees the line.
+    """
+    if left < threshold and center < threshold and right < threshold:
+        return None
+    total = left + center + right
+    return (right - left) / total
+
+
+class PIDController:
+    """Textbook PID with output clamping and integral anti-windup"""
+
+    def __init__(self, kp=1.0, ki=0.0, kd=0.0, output_limit=1.0, integral_limit=1.0):
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.output_limit = output_limit
+        self.integral_limit = integral_limit
+        self.reset()
+
+    def reset(self):
+        self.integral = 0.0
+        self.previous_error = None
+
+    def update(self, error, dt):
+        if dt <= 0:
+            dt = 1e-3
+        self.integral += error * dt
+        self.integral = max(-self.integral_limit, min(self.integral_limit, self.integral))
+        derivative = 0.0 if self.previous_error is None else (error - self.previous_error) / dt
+        self.previous_error = error
+        output = self.kp * error + self.ki * self.integral + self.kd * derivative
+        return max(-self.output_limit, min(self.output_limit, output))
+
+
+class LineFollower:
+    """Turns FRAME_LINE telemetry into steering commands
+
+    The 8051 only understands discrete F/L/R commands, so the continuous
+    PID output is applied as a turn duty cycle: a sigma-delta accumulator
+    issues L or R on the fraction of frames equal to |steering| and F on
+    the rest. When the line is lost the rover keeps turning towards the
+    side it was last seen on, and stops after `lost_timeout` seconds.
+
+    `on_line` runs on the reader thread and `stop` on the UI thread; a lock
+    keeps steering from going out after the stop and the log from being
+    written after it is closed.
+    """
+
+    def __init__(self, send, pid=None, threshold=DEFAULT_THRESHOLD, lost_timeout=1.0):
+        self.send = send
+        self.pid = pid or PIDController(kp=1.2, ki=0.0, kd=0.08)
+        self.threshold = threshold
+        self.lost_timeout = lost_timeout
+
+        self.running = False
+        self.position = None
+        self.steering = 0.0
+        self.command = None
+
+        self._last_time = None
+        self._frame_dt = 0.02
+        self._last_seen = 0.0
+        self._last_side = 1.0
+        self._duty = 0.0
+        self._log = None
+        self._log_writer = None
+        self._lock = threading.Lock()
+
+    def start(self, log_path=None):
+        """Begin following; optionally record frames and commands for tuning"""
+        with self._lock:
+            self.pid.reset()
+            self.command = None
+            self._last_time = None
+            # Set from the first frame: line-loss timing follows frame time, which
+            # is the recording's clock when a session is replayed
+            self._last_seen = None
+            self._duty = 0.0
+            if log_path:
+                self._log = open(log_path, 'w', encoding='utf-8', newline='')
+                self._log_writer = csv.writer(self._log)
+                self._log_writer.writerow(LOG_FIELDS)
+            self.running = True
+
+    def stop(self):
+        """Stop following and halt the rover"""
+        with self._lock:
+            self.running = False
+            self._issue('S')
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+                self._log_writer = None
+
+    def on_line(self, values, timestamp):
+        """Telemetry listener for FRAME_LINE"""
+        if not self.running:
+            return
+        with self._lock:
+            if self.running:
+                self._follow(values, timestamp)
+
+    def _follow(self, values, timestamp):
+        left, center, right = values
+        if self._last_time is not None and timestamp > self._last_time:
+            # Frames parsed from the same chunk share a timestamp; keep the last real period
+            self._frame_dt = timestamp - self._last_time
+        dt = self._frame_dt
+        self._last_time = timestamp
+        if self._last_seen is None:
+            self._last_seen = timestamp
+
+        position = estimate_line_position(left, center, right, self.threshold)
+        self.position = position
+        if position is None:
+            # Search towards the side the line was last seen on
+            if timestamp - self._last_seen > self.lost_timeout:
+                command = 'S'
+            else:
+                command = 'R' if self._last_side > 0 else 'L'
+        else:
+            self._last_seen = timestamp
+            if position:
+                self._last_side = position
+            self.steering = self.pid.update(position, dt)
+            command = self._modulate(self.steering)
+
+        if self._log_writer is not None:
+            self._log_writer.writerow((f"{timestamp:.4f}", left, center, right, command))
+        if command != self.command:
+            self._issue(command)
+
+    def _modulate(self, steering):
+        self._duty += abs(steering)
+        if self._duty >= 1.0:
+            self._duty -= 1.0
+            return 'R' if steering > 0 else 'L'
+        return 'F'
+
+    def _issue(self, command):
+        # Called with the lock held; a stopped follower only ever sends S
+        if not self.running and command != 'S':
+            return
+        self.command = command
+        self.send(command)
+
+
+# Offline tuning
+
+def load_line_log(path):
+    """Read a LineFollower CSV log into (times, left, center, right, commands) lists"""
+    times, left, center, right, commands = [], [], [], [], []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            times.append(float(row['time']))
+            left.append(int(row['left']))
+            center.append(int(row['center']))
+            right.append(int(row['right']))
+            commands.append(row['command'])
+    return times, left, center, right, commands
+
+
+def gain_grid(kp_values, ki_values, kd_values):
+    """Every (kp, ki, kd) combination as a (K, 3) array"""
+    np = _require_numpy()
+    kp, ki, kd = np.meshgrid(kp_values, ki_values, kd_values, indexing='ij')
+    return np.stack([kp.ravel(), ki.ravel(), kd.ravel()], axis=1)
+
+
+def replay_gains(times, left, center, right, commands, gains, plant_gain=2.0,
+                 threshold=DEFAULT_THRESHOLD, effort_weight=0.05, integral_limit=1.0):
+    """Score many PID gain sets against one recorded run at once
+
+    The recording gives the line position and the steering actually applied
+    at each step. With a first-order lateral model
+        position[t+1] = position[t] + disturbance[t] - plant_gain * steering[t] * dt
+    the track's disturbance (curvature, slip) is recovered from the log and
+    replayed in closed loop for every gain set in parallel: the time loop
+    runs in Python, each step is a NumPy operation over all K gain sets.
+
+    Returns an array of K costs (mean squared position error plus
+    `effort_weight` times mean squared steering), lower is better.
+    """
+    np = _require_numpy()
+    gains = np.atleast_2d(np.asarray(gains, dtype=float))
+    t = np.asarray(times, dtype=float)
+    ir = np.stack([np.asarray(left, float), np.asarray(center, float), np.asarray(right, float)])
+
+    # Measured position; when the line is lost assume it sits at the last seen edge
+    on_line = (ir >= threshold).any(axis=0)
+    total = np.where(ir.sum(axis=0) > 0, ir.sum(axis=0), 1.0)
+    measured = np.where(on_line, (ir[2] - ir[0]) / total, np.nan)
+    last = 0.0
+    for i in range(len(measured)):
+        if np.isnan(measured[i]):
+            measured[i] = 1.0 if last > 0 else -1.0
+        else:
+            last = measured[i] if measured[i] else last
+
+    dt = np.diff(t)
+    nominal = np.median(dt[dt > 0]) if (dt > 0).any() else 0.02
+    dt = np.where(dt > 0, dt, nominal)
+    applied = np.array([COMMAND_STEERING.get(c, 0.0) for c in commands[:-1]])
+    disturbance = np.diff(measured) + plant_gain * applied * dt
+
+    kp, ki, kd = gains[:, 0], gains[:, 1], gains[:, 2]
+    count = len(gains)
+    position = np.full(count, measured[0])
+    integral = np.zeros(count)
+    previous = position.copy()
+    error_cost = np.zeros(count)
+    effort_cost = np.zeros(count)
+
+    for step in range(len(dt)):
+        h = dt[step]
+        integral = np.clip(integral + position * h, -integral_limit, integral_limit)
+        derivative = (position - previous) / h
+        previous = position
+        steering = np.clip(kp * position + ki * integral + kd * derivative, -1.0, 1.0)
+        position = np.clip(position + disturbance[step] - plant_gain * steering * h, -1.5, 1.5)
+        error_cost += position * position
+        effort_cost += steering * steering
+
+    steps = max(1, len(dt))
+    return error_cost / steps + effort_weight * effort_cost / steps
+
+
+def _require_numpy():
+    # Imported on first use: the app imports this module at startup and
+    # never replays gains, so it should not pay for loading NumPy
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("NumPy is required for offline gain replay")
+    return numpy
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Smart Rover - Command Log
+Fixed-depth log store with an optional on-disk session history
+"""
+
+import os
+import time
+from collections import deque
+from datetime import datetime
+
+DEFAULT_DEPTH = 10
+
+
+class CommandLog:
+    """Keeps the last `depth` entries in memory and streams all of them to disk
+
+    Appending is O(1) regardless of history length; the UI reads `text()`
+    at most once per frame when `dirty` is set.
+    """
+
+    def __init__(self, depth=DEFAULT_DEPTH, placeholder='Ready to connect...'):
+        self.entries = deque(maxlen=depth)
+        self.placeholder = placeholder
+        self.dirty = False
+        self.total = 0
+        self.session_path = None
+
+        self._session = None
+        self._stamp_second = None
+        self._stamp = ''
+
+    @property
+    def depth(self):
+        return self.entries.maxlen
+
+    @depth.setter
+    def depth(self, value):
+        self.entries = deque(self.entries, maxlen=value)
+        self.dirty = True
+
+    def append(self, message):
+        """Add one entry, returns the formatted line"""
+        # Timestamps only change once a second, so format them once a second
+        second = int(time.time())
+        if second != self._stamp_second:
+            self._stamp_second = second
+            self._stamp = datetime.fromtimestamp(second).strftime("%H:%M:%S")
+        entry = f"[{self._stamp}] {message}"
+
+        self.entries.append(entry)
+        self.total += 1
+        self.dirty = True
+        if self._session is not None:
+            self._session.write(entry + '\n')
+        return entry
+
+    def text(self):
+        """Visible log text, clears the dirty flag"""
+        self.dirty = False
+        if not self.entries:
+            return self.placeholder
+        return '\n'.join(self.entries)
+
+    def open_session(self, directory, prefix='commands'):
+        """Start streaming every entry to a new file in `directory`"""
+        self.close_session()
+        os.makedirs(directory, exist_ok=True)
+        name = datetime.now().strftime(f"{prefix}-%Y%m%d-%H%M%S.log")
+        self.session_path = os.path.join(directory, name)
+        self._session = open(self.session_path, 'a', encoding='utf-8')
+        return self.session_path
+
+    def close_session(self):
+        """Flush and close the session file"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Smart Rover - Metrics
+Fixed-size latency windows, histograms and counters for hot-path instrumentation
+"""
+
+import json
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+# Histogram bucket edges: 1 us .. ~10 s, 8 buckets per decade
+HISTOGRAM_BOUNDS = tuple(1e-6 * 10 ** (i / 8.) for i in range(57))
+
+
+class LatencyWindow:
+    """Keeps the last `size` durations (seconds) in a preallocated ring
+
+    Recording is a single array store; percentiles sort a copy and are
+    meant to be read a few times a second by the UI, not per sample.
+    """
+
+    def __init__(self, size=1024):
+        self.size = size
+        self.samples = array('d', bytes(8 * size))
+        self.count = 0
+        self.total = 0
+        self._next = 0
+
+    def add(self, seconds):
+        self.samples[self._next] = seconds
+        self._next = (self._next + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+        self.total += 1
+
+    def reset(self):
+        self.count = 0
+        self.total = 0
+        self._next = 0
+
+    def percentile(self, pct):
+        """Duration below which `pct` percent of the window falls, None if empty"""
+        if not self.count:
+            return None
+        ordered = sorted(self.samples[:self.count])
+        index = min(self.count - 1, int(round(pct / 100. * (self.count - 1))))
+        return ordered[index]
+
+    def percentiles(self, *pcts):
+        """Several percentiles from a single sort"""
+        if not self.count:
+            return tuple(None for _ in pcts)
+        ordered = sorted(self.samples[:self.count])
+        last = self.count - 1
+        return tuple(ordered[min(last, int(round(pct / 100. * last)))] for pct in pcts)
+
+
+class Histogram:
+    """Fixed log-scale buckets of durations (seconds)
+
+    Recording is a bisect plus two array stores, memory never grows and
+    percentiles are read from the bucket counts without sorting. Values
+    are reported as the upper edge of their bucket (within ~33%).
+    """
+
+    def __init__(self, bounds=HISTOGRAM_BOUNDS):
+        self.bounds = bounds
+        self.buckets = array('L', bytes(array('L').itemsize * (len(bounds) + 1)))
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.buckets[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def reset(self):
+        for i in range(len(self.buckets)):
+            self.buckets[i] = 0
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else None
+
+    def percentiles(self, *pcts):
+        """Bucket upper edges below which each of `pcts` percent falls"""
+        if not self.count:
+            return tuple(None for _ in pcts)
+        targets = sorted((pct / 100. * self.count, i) for i, pct in enumerate(pcts))
+        results = [None] * len(pcts)
+        seen = 0
+        target = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            while seen and target < len(targets) and seen >= targets[target][0]:
+                edge = self.bounds[index] if index < len(self.bounds) else self.max
+                results[targets[target][1]] = min(edge, self.max)
+                target += 1
+            if target == len(targets):
+                break
+        return tuple(results)
+
+    def percentile(self, pct):
+        return self.percentiles(pct)[0]
+
+    def as_dict(self):
+        p50, p90, p99 = self.percentiles(50, 90, 99)
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'max': self.max,
+            'p50': p50,
+            'p90': p90,
+            'p99': p99,
+            'buckets': {f"{self.bounds[i]:.3g}" if i < len(self.bounds) else 'inf': count
+                        for i, count in enumerate(self.buckets) if count},
+        }
+
+
+class Profiler:
+    """Named timers and counters for the app's hot paths
+
+    Disabled by default. Call sites guard on `enabled` before touching the
+    clock, so a disabled profiler costs one attribute load per site:
+
+        if PROFILER.enabled:
+            start = time.perf_counter()
+        ...
+        if PROFILER.enabled:
+            PROFILER.record('command.write', time.perf_counter() - start)
+
+    The transport worker, telemetry reader, store writer and UI threads all
+    record at once, so updates and snapshots are serialised with a lock.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.timers = {}
+        self.counters = {}
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        """Add one duration to the `name` histogram"""
+        with self._lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                timer = self.timers[name] = Histogram()
+            timer.add(seconds)
+
+    def count(self, name, amount=1):
+        """Increment the `name` counter"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def timer(self, name):
+        return self.timers.get(name)
+
+    def reset(self):
+        with self._lock:
+            self.timers.clear()
+            self.counters.clear()
+            self.started = time.monotonic()
+
+    def snapshot(self):
+        """Every timer and counter as plain data"""
+        with self._lock:
+            return {
+                'elapsed': time.monotonic() - self.started,
+                'timers': {name: timer.as_dict() for name, timer in sorted(self.timers.items())},
+                'counters': dict(sorted(self.counters.items())),
+            }
+
+    def export(self, directory, prefix='metrics'):
+        """Write a JSON snapshot into `directory`, returns its path"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{prefix}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        return path
+
+
+# Process-wide profiler; set ROVER_PROFILE=1 to enable from startup
+PROFILER = Profiler(enabled=os.environ.get('ROVER_PROFILE') == '1')
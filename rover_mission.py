@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Smart Rover - Missions
+Compiles scripted movement sequences into timed byte schedules for the
+transport worker, and stores them as small text files
+
+Script syntax, one step per line ('#' starts a comment):
+    forward 2       drive forward for 2 seconds (also F, left/L, right/R, back/B)
+    stop            stop (optionally 'stop 1' to stay stopped for 1 second)
+    wait 0.5        keep the current motion for 0.5 seconds
+    repeat 4        repeat the steps up to the matching 'end'
+    end
+"""
+
+import os
+
+from rover_transport import COMMAND_BYTES
+
+MISSION_EXTENSION = '.mission'
+
+STEP_COMMANDS = {
+    'f': 'F', 'forward': 'F',
+    'b': 'B', 'back': 'B', 'backward': 'B',
+    'l': 'L', 'left': 'L',
+    'r': 'R', 'right': 'R',
+    's': 'S', 'stop': 'S',
+}
+
+# Missions written to an empty store so there is something to run
+DEFAULT_MISSIONS = {
+    'square': "repeat 4\n    forward 1.5\n    left 0.6\nend\nstop\n",
+    'patrol': "repeat 3\n    forward 2\n    stop 0.5\n    back 2\n    stop 0.5\nend\n",
+    'wiggle': "repeat 5\n    left 0.3\n    right 0.3\nend\nstop\n",
+}
+
+# Longest mission accepted, seconds
+MAX_DURATION = 3600
+
+# Most steps a mission may expand to; zero-length steps ('stop') add nothing
+# to the duration, so 'repeat' is bounded by this as well
+MAX_STEPS = 10000
+
+
+class MissionError(ValueError):
+    """Raised for a script that cannot be compiled"""
+
+
+class Mission:
+    """A compiled mission: the source plus its (offset, bytes) write schedule"""
+
+    def __init__(self, name, source, schedule, duration):
+        self.name = name
+        self.source = source
+        self.schedule = schedule
+        self.duration = duration
+
+    @property
+    def steps(self):
+        return len(self.schedule)
+
+
+def _parse(lines, start, depth):
+    """Parse lines into (command, seconds) steps until a matching 'end'"""
+    steps = []
+    index = start
+    while index < len(lines):
+        number, text = lines[index]
+        index += 1
+        words = text.split('#', 1)[0].lower().split()
+        if not words:
+            continue
+        keyword, args = words[0], words[1:]
+        if keyword == 'end':
+            if depth == 0:
+                raise MissionError(f"Line {number}: 'end' without 'repeat'")
+            return steps, index
+        if keyword == 'repeat':
+            count = _number(args, number, integer=True)
+            body, index = _parse(lines, index, depth + 1)
+            # Check the expanded size before building it
+            if len(steps) + count * len(body) > MAX_STEPS:
+                raise MissionError(f"Line {number}: mission longer than {MAX_STEPS} steps")
+            if _duration(steps) + count * _duration(body) > MAX_DURATION:
+                raise MissionError(f"Line {number}: mission longer than {MAX_DURATION} s")
+            steps.extend(body * count)
+            continue
+        if keyword == 'wait':
+            steps.append((None, _number(args, number)))
+            continue
+        command = STEP_COMMANDS.get(keyword)
+        if command is None:
+            raise MissionError(f"Line {number}: unknown step '{keyword}'")
+        if command == 'S' and not args:
+            steps.append(('S', 0.0))
+        else:
+            steps.append((command, _number(args, number)))
+    if depth:
+        raise MissionError("'repeat' without 'end'")
+    return steps, index
+
+
+def _duration(steps):
+    return sum(seconds for _, seconds in steps)
+
+
+def _number(args, number, integer=False):
+    if len(args) != 1:
+        raise MissionError(f"Line {number}: expected one number")
+    try:
+        value = int(args[0]) if integer else float(args[0])
+    except ValueError:
+        raise MissionError(f"Line {number}: '{args[0]}' is not a number")
+    if value < 0:
+        raise MissionError(f"Line {number}: negative value")
+    return value
+
+
+def compile_mission(source, name='mission'):
+    """Turn a script into a Mission with absolute write offsets
+
+    Consecutive steps with the same command share one write, and a final
+    stop is always appended, so the schedule holds exactly the bytes that
+    go over the link.
+    """
+    lines = list(enumerate(source.splitlines(), 1))
+    steps, _ = _parse(lines, 0, 0)
+
+    schedule = []
+    offset = 0.0
+    current = None
+    for command, seconds in steps:
+        if command is not None and command != current:
+            schedule.append((round(offset, 6), COMMAND_BYTES[command]))
+            current = command
+        offset += seconds
+        if offset > MAX_DURATION:
+            raise MissionError(f"Mission longer than {MAX_DURATION} s")
+    if current != 'S':
+        schedule.append((round(offset, 6), COMMAND_BYTES['S']))
+    if not schedule:
+        raise MissionError("Mission has no steps")
+    return Mission(name, source, schedule, round(offset, 6))
+
+
+class MissionStore:
+    """Mission scripts kept as text files in one directory"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, name):
+        safe = ''.join(c for c in name if c.isalnum() or c in '-_ ').strip()
+        if not safe:
+            raise MissionError("Mission name is empty")
+        return os.path.join(self.directory, safe + MISSION_EXTENSION)
+
+    def names(self):
+        """Stored mission names, seeding the defaults into an empty store"""
+        try:
+            files = os.listdir(self.directory)
+        except FileNotFoundError:
+            files = []
+        names = sorted(f[:-len(MISSION_EXTENSION)] for f in files if f.endswith(MISSION_EXTENSION))
+        if not names:
+            for name, source in DEFAULT_MISSIONS.items():
+                self.save(name, source)
+            names = sorted(DEFAULT_MISSIONS)
+        return names
+
+    def source(self, name):
+        with open(self._path(name), encoding='utf-8') as f:
+            return f.read()
+
+    def load(self, name):
+        """Read and compile a stored mission"""
+        return compile_mission(self.source(name), name)
+
+    def save(self, name, source):
+        """Compile (to validate) and store a mission script"""
+        mission = compile_mission(source, name)
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(name), 'w', encoding='utf-8') as f:
+            f.write(source)
+        return mission
+
+    def delete(self, name):
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Smart Rover - Performance Overlay
+Toggleable on-screen readout of frame rate, command latency, queue depth and link throughput
+"""
+
+import time
+
+from kivy.clock import Clock
+from kivy.graphics import Color, Rectangle
+from kivy.uix.label import Label
+
+from rover_metrics import PROFILER
+
+
+class PerformanceOverlay(Label):
+    """Small translucent panel drawn above every screen
+
+    Showing the overlay enables the process-wide profiler; hiding it turns
+    the profiler off again so the instrumented paths go back to a single
+    flag check. `queue_depth` is a callable returning the number of
+    commands currently queued or in flight; `status` returns extra lines
+    to show below the readout.
+    """
+
+    def __init__(self, queue_depth=None, status=None, interval=0.5, **kwargs):
+        kwargs.setdefault('size_hint', (None, None))
+        kwargs.setdefault('size', (240, 150))
+        kwargs.setdefault('font_size', '11sp')
+        kwargs.setdefault('halign', 'left')
+        kwargs.setdefault('valign', 'top')
+        super().__init__(**kwargs)
+        self.text_size = self.size
+        self.queue_depth = queue_depth
+        self.status = status
+        self.interval = interval
+        self.active = False
+        self._update_event = None
+        self._frame_event = None
+        self._last_time = 0.0
+        self._last_counters = {}
+
+        with self.canvas.before:
+            Color(0, 0, 0, 0.6)
+            self._background = Rectangle(pos=self.pos, size=self.size)
+        self.bind(pos=self._on_geometry, size=self._on_geometry)
+
+    def _on_geometry(self, *args):
+        self._background.pos = self.pos
+        self._background.size = self.size
+        self.text_size = self.size
+
+    def show(self):
+        """Enable profiling and start refreshing the readout"""
+        if self.active:
+            return
+        self.active = True
+        PROFILER.enabled = True
+        self._last_time = time.monotonic()
+        self._last_counters = dict(PROFILER.counters)
+        self._frame_event = Clock.schedule_interval(self._on_frame, 0)
+        self._update_event = Clock.schedule_interval(self._update, self.interval)
+        self.opacity = 1
+
+    def hide(self):
+        """Stop refreshing and disable profiling"""
+        if not self.active:
+            return
+        self.active = False
+        PROFILER.enabled = False
+        self._frame_event.cancel()
+        self._update_event.cancel()
+        self._frame_event = self._update_event = None
+        self.opacity = 0
+
+    def _on_frame(self, dt):
+        PROFILER.record('ui.frame', dt)
+
+    def _rate(self, name, elapsed):
+        count = PROFILER.counters.get(name, 0)
+        return (count - self._last_counters.get(name, 0)) / elapsed if elapsed > 0 else 0.0
+
+    def _update(self, dt):
+        now = time.monotonic()
+        elapsed = now - self._last_time
+        tx_rate = self._rate('command.bytes', elapsed)
+        rx_rate = self._rate('telemetry.bytes', elapsed)
+        layout_rate = self._rate('ui.layout_passes', elapsed)
+        texture_rate = self._rate('ui.texture_uploads', elapsed)
+        self._last_time = now
+        self._last_counters = dict(PROFILER.counters)
+
+        lines = [f"FPS {Clock.get_fps():.0f}"]
+        frame = PROFILER.timer('ui.frame')
+        if frame is not None and frame.count:
+            frame_p99 = frame.percentile(99)
+            lines[0] += f"  frame p99 {frame_p99 * 1000:.1f} ms"
+        latency = PROFILER.timer('command.latency')
+        if latency is not None and latency.count:
+            p50, p99 = latency.percentiles(50, 99)
+            lines.append(f"Cmd queue->write p50/p99 {p50 * 1000:.1f} / {p99 * 1000:.1f} ms")
+        else:
+            lines.append("Cmd queue->write: no data")
+        if self.queue_depth is not None:
+            lines.append(f"Queue depth {self.queue_depth()}")
+        lines.append(f"TX {tx_rate:.0f} B/s  RX {rx_rate:.0f} B/s")
+        lines.append(f"Layout {layout_rate:.0f}/s  Tex {texture_rate:.0f}/s")
+        if self.status is not None:
+            lines.append(self.status())
+        self.text = "\n".join(lines)
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Smart Rover - Adaptive Telemetry Rates
+Negotiates per-stream sample rates with the rover from what the visible
+screens need, the throughput the link actually delivers and the phone's battery
+"""
+
+import time
+
+from rover_telemetry import (rate_command, frame_size, FRAME_DISTANCE, FRAME_LINE,
+                             FRAME_CLIMATE, FRAME_HEARTBEAT)
+
+try:
+    from plyer import battery
+    PLYER_AVAILABLE = True
+except ImportError:
+    PLYER_AVAILABLE = False
+
+STREAM_NAMES = {
+    FRAME_DISTANCE: 'Distance',
+    FRAME_LINE: 'Line',
+    FRAME_CLIMATE: 'Climate',
+    FRAME_HEARTBEAT: 'Heartbeat',
+}
+
+# Streams kept alive with no screen asking: the heartbeat feeds the link
+# health check, a slow climate stream keeps the sensor history going
+BACKGROUND_RATES = {FRAME_HEARTBEAT: 2.0, FRAME_CLIMATE: 0.2}
+
+# Share of the link telemetry may use; the rest is headroom for commands
+LINK_BUDGET = 0.5
+
+# UART framing: 1 start + 8 data + 1 stop bit
+BITS_PER_BYTE = 10
+
+# Battery levels (percent) below which non-essential rates are scaled down
+BATTERY_LEVELS = ((20, 0.25), (50, 0.5))
+BATTERY_INTERVAL = 60.0
+
+# Relative change needed before a new rate is sent to the rover
+RATE_TOLERANCE = 0.1
+
+
+def battery_state():
+    """(percentage, charging) from plyer, None when unavailable"""
+    if not PLYER_AVAILABLE:
+        return None
+    try:
+        status = battery.status
+    except Exception:
+        return None
+    percentage = status.get('percentage')
+    if percentage is None:
+        return None
+    return percentage, bool(status.get('isCharging'))
+
+
+class TelemetryRateController:
+    """Chooses and sends a sample rate for every telemetry stream
+
+    Consumers (screens, controllers) `require` the rates they need and
+    `release` them when hidden; a stream nobody needs is paused on the
+    rover. The requested rates are then scaled by battery state and fitted
+    into `budget` of the estimated link capacity. The estimate starts at
+    the nominal UART rate and follows what the link delivers: it backs off
+    multiplicatively when fewer bytes arrive than the applied rates should
+    produce, and recovers slowly when they keep up.
+
+    `send(command)` queues a rate command on the transport's control path
+    (never its motion queue) and `connected()` reports whether the link is
+    up; nothing is sent while it is down. `resync` must be called after
+    every (re)connect since the firmware boots with its defaults. `update`
+    is called periodically from a UI timer.
+    """
+
+    def __init__(self, parser, send=None, baudrate=9600, budget=LINK_BUDGET,
+                 background=BACKGROUND_RATES, battery_reader=battery_state, wakeups=None,
+                 connected=None):
+        self.parser = parser
+        self.send = send
+        self.connected = connected
+        self.nominal_capacity = baudrate / float(BITS_PER_BYTE)
+        self.capacity = self.nominal_capacity
+        self.budget = budget
+        self.background = dict(background)
+        self.battery_reader = battery_reader
+        self.wakeups = wakeups
+
+        self.demands = {}
+        self.applied = {}
+        self.battery = None
+        self.rate_commands = 0
+
+        # Measurements over the last update interval
+        self.bytes_per_sec = 0.0
+        self.wakeups_per_sec = 0.0
+        self.expected_bytes_per_sec = 0.0
+
+        self._last_update = None
+        self._last_bytes = 0
+        self._last_wakeups = 0
+        self._changed_at = 0.0
+        self._battery_checked = None
+
+    # Demand
+
+    def require(self, consumer, rates):
+        """Register the {frame type: Hz} rates `consumer` needs"""
+        self.demands[consumer] = dict(rates)
+        self.apply()
+
+    def release(self, consumer):
+        """Drop `consumer`'s demand, pausing streams nobody else needs"""
+        if self.demands.pop(consumer, None) is not None:
+            self.apply()
+
+    def attach(self, send, wakeups=None, connected=None):
+        """Send rate commands through `send` from now on"""
+        self.send = send
+        if wakeups is not None:
+            self.wakeups = wakeups
+        if connected is not None:
+            self.connected = connected
+        self.resync()
+
+    def resync(self):
+        """Re-send every rate, e.g. after the rover (re)connected"""
+        self.applied.clear()
+        self.capacity = self.nominal_capacity
+        self._last_update = None
+        self.apply()
+
+    # Rate selection
+
+    def battery_scale(self):
+        if self.battery is None:
+            return 1.0
+        percentage, charging = self.battery
+        if charging:
+            return 1.0
+        for level, scale in BATTERY_LEVELS:
+            if percentage < level:
+                return scale
+        return 1.0
+
+    def target_rates(self):
+        """Rate per stream after demand, battery and bandwidth limits"""
+        rates = {frame_type: 0.0 for frame_type in STREAM_NAMES}
+        for frame_type, rate in self.background.items():
+            rates[frame_type] = rate
+        for demand in self.demands.values():
+            for frame_type, rate in demand.items():
+                rates[frame_type] = max(rates.get(frame_type, 0.0), rate)
+
+        scale = self.battery_scale()
+        for frame_type in rates:
+            if frame_type != FRAME_HEARTBEAT:
+                rates[frame_type] *= scale
+
+        # Fit the scalable streams into the bandwidth budget
+        budget = self.capacity * self.budget
+        fixed = rates.get(FRAME_HEARTBEAT, 0.0) * frame_size(FRAME_HEARTBEAT)
+        scalable = sum(rate * frame_size(frame_type) for frame_type, rate in rates.items()
+                       if frame_type != FRAME_HEARTBEAT)
+        if scalable and fixed + scalable > budget:
+            factor = max(0.0, budget - fixed) / scalable
+            for frame_type in rates:
+                if frame_type != FRAME_HEARTBEAT:
+                    rates[frame_type] *= factor
+        return rates
+
+    def apply(self):
+        """Send rate commands for every stream whose target moved"""
+        if self.send is None:
+            return
+        # Rates queued during an outage would be stale; resync resends them all
+        if self.connected is not None and not self.connected():
+            return
+        for frame_type, rate in self.target_rates().items():
+            current = self.applied.get(frame_type)
+            if current is not None:
+                if rate == current:
+                    continue
+                if rate and current and abs(rate - current) <= RATE_TOLERANCE * current:
+                    continue
+            if self.send(rate_command(frame_type, rate)) is False:
+                continue
+            self.applied[frame_type] = rate
+            self.rate_commands += 1
+            self._changed_at = time.monotonic()
+
+    # Measurement
+
+    def update(self):
+        """Measure the last interval, refresh battery state and re-apply rates"""
+        now = time.monotonic()
+        if self._battery_checked is None or now - self._battery_checked > BATTERY_INTERVAL:
+            self._battery_checked = now
+            self.battery = self.battery_reader() if self.battery_reader else None
+
+        received = self.parser.bytes_received
+        wakeups = self.parser.chunks + (self.wakeups() if self.wakeups else 0)
+        if self._last_update is not None:
+            elapsed = now - self._last_update
+            if elapsed > 0:
+                self.bytes_per_sec = (received - self._last_bytes) / elapsed
+                self.wakeups_per_sec = (wakeups - self._last_wakeups) / elapsed
+                self.expected_bytes_per_sec = sum(rate * frame_size(frame_type)
+                                                  for frame_type, rate in self.applied.items())
+                # Only judge the link on an interval with stable rates
+                if self._changed_at < self._last_update:
+                    self._adapt_capacity()
+        self._last_update = now
+        self._last_bytes = received
+        self._last_wakeups = wakeups
+        self.apply()
+
+    def _adapt_capacity(self):
+        expected = self.expected_bytes_per_sec
+        if not expected:
+            return
+        if self.bytes_per_sec < 0.8 * expected:
+            # The link is not delivering what was asked for: back off
+            self.capacity = max(self.nominal_capacity * 0.1, self.capacity * 0.75)
+        elif self.capacity < self.nominal_capacity:
+            self.capacity = min(self.nominal_capacity, self.capacity * 1.1)
+
+    def report(self):
+        """Human-readable stream rates and link usage"""
+        lines = [f"Telemetry {self.bytes_per_sec:.0f} B/s, {self.wakeups_per_sec:.0f} wakeups/s"]
+        if self.capacity < self.nominal_capacity:
+            lines[0] += f", link {self.capacity:.0f} B/s"
+        if self.battery is not None:
+            lines[0] += f", battery {self.battery[0]:.0f}%"
+        streams = []
+        for frame_type, name in STREAM_NAMES.items():
+            rate = self.applied.get(frame_type)
+            if rate is None:
+                continue
+            streams.append(f"{name[0]} {rate:.1f} Hz" if rate else f"{name[0]} off")
+        lines.append("  ".join(streams))
+        return "\n".join(lines)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Smart Rover - Session Recording
+Append-only binary log of every byte crossing the transport, and a player
+that feeds a recording back through the telemetry parser and controllers
+
+File layout (little-endian):
+    header:  b'RVRS' | version u8 | wall-clock start f64
+    record:  monotonic offset f64 | kind u8 | length u16 | payload[length]
+"""
+
+import os
+import struct
+import threading
+import time
+
+MAGIC = b'RVRS'
+VERSION = 1
+
+HEADER = struct.Struct('<4sBd')
+RECORD = struct.Struct('<dBH')
+
+# Record kinds
+KIND_RX = 1         # telemetry bytes read from the rover
+KIND_TX = 2         # command bytes written to the rover
+KIND_EVENT = 3      # UTF-8 note, e.g. a connection state change
+
+# Recordings are written through a buffer this size and flushed when it fills
+WRITE_BUFFER = 64 * 1024
+
+# Longest payload one record can hold
+MAX_RECORD = 0xFFFF
+
+
+class SessionRecorder:
+    """Appends timestamped transport traffic to a session file
+
+    `record` is called from the transport worker (TX) and the telemetry
+    reader (RX) threads; one lock keeps records whole. Timestamps are
+    monotonic offsets from the recorder's creation, so a recording never
+    jumps with the wall clock. An existing file is never overwritten:
+    opening one raises FileExistsError.
+    """
+
+    def __init__(self, path, buffer_size=WRITE_BUFFER):
+        self.path = path
+        self.records = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._origin = time.monotonic()
+        self._file = open(path, 'xb', buffering=buffer_size)
+        self._file.write(HEADER.pack(MAGIC, VERSION, time.time()))
+
+    @classmethod
+    def create(cls, directory, prefix='session'):
+        """New recording named after the current time inside `directory`
+
+        A reconnect within the same second gets a numeric suffix instead of
+        replacing the recording before it.
+        """
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"{prefix}-{time.strftime('%Y%m%d-%H%M%S')}")
+        path = base + '.rvs'
+        suffix = 1
+        while True:
+            try:
+                return cls(path)
+            except FileExistsError:
+                suffix += 1
+                path = f"{base}-{suffix}.rvs"
+
+    def record(self, kind, data, timestamp=None):
+        """Append one record; `timestamp` is a time.monotonic() value"""
+        offset = (time.monotonic() if timestamp is None else timestamp) - self._origin
+        with self._lock:
+            if self._file is None:
+                return
+            for start in range(0, len(data), MAX_RECORD):
+                chunk = data[start:start + MAX_RECORD]
+                self._file.write(RECORD.pack(offset, kind, len(chunk)))
+                self._file.write(chunk)
+                self.records += 1
+            self.bytes += len(data)
+
+    def event(self, text):
+        """Record a short note alongside the traffic"""
+        self.record(KIND_EVENT, text.encode('utf-8'))
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            session_file, self._file = self._file, None
+        if session_file is not None:
+            session_file.close()
+
+
+def iter_session(path):
+    """Yield (offset, kind, payload) for every complete record in a recording
+
+    A record cut short by a crash ends the iteration instead of raising.
+    """
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{path} is not a session recording")
+        magic, version, started = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} session recording")
+        while True:
+            head = f.read(RECORD.size)
+            if len(head) < RECORD.size:
+                return
+            offset, kind, length = RECORD.unpack(head)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            yield offset, kind, payload
+
+
+class SessionPlayer:
+    """Plays a recording back into a TelemetryParser
+
+    Received bytes are fed to `parser` exactly as the telemetry reader fed
+    them, so the screens polling its state and the controllers registered
+    as listeners see the original stream. Frames are stamped with the
+    recorded times (relative to the start of playback), which keeps
+    timestamp-driven controllers deterministic at any speed. Recorded
+    commands go to `on_command(data, timestamp)` for comparison with what
+    the controllers send now.
+
+    `speed` 1.0 plays in real time, 2.0 twice as fast, 0 as fast as possible.
+    """
+
+    def __init__(self, path, parser=None, on_command=None, on_event=None, on_finished=None,
+                 speed=1.0):
+        self.path = path
+        self.parser = parser
+        self.on_command = on_command
+        self.on_event = on_event
+        self.on_finished = on_finished
+        self.speed = speed
+        self.records = 0
+        self.duration = 0.0
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Play on a background thread"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='session-replay', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self):
+        try:
+            self.run()
+        finally:
+            self._running = False
+            if self.on_finished:
+                self.on_finished(self)
+
+    def run(self):
+        """Play the whole recording on the calling thread, returns the record count"""
+        self._running = True
+        self.records = 0
+        base = time.monotonic()
+        speed = self.speed
+        parser = self.parser
+        for offset, kind, payload in iter_session(self.path):
+            if not self._running:
+                break
+            if speed > 0:
+                delay = base + offset / speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            timestamp = base + offset
+            if kind == KIND_RX:
+                if parser is not None:
+                    parser.feed(payload, timestamp=timestamp)
+            elif kind == KIND_TX:
+                if self.on_command:
+                    self.on_command(payload, timestamp)
+            elif kind == KIND_EVENT:
+                if self.on_event:
+                    self.on_event(payload.decode('utf-8', 'replace'), timestamp)
+            self.records += 1
+            self.duration = offset
+        self._running = False
+        return self.records
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Smart Rover - Rover Simulator
+In-process model of the 8051 firmware behind an HC-05 at 9600 baud, used as
+a transport backend on desktop and for benchmarking without hardware
+"""
+
+import random
+import threading
+import time
+from collections import deque
+
+from rover_metrics import LatencyWindow
+from rover_telemetry import (encode_frame, parse_rate_command, FRAME_DISTANCE, FRAME_LINE,
+                             FRAME_CLIMATE, FRAME_HEARTBEAT)
+from rover_transport import Link
+
+# UART framing: 1 start + 8 data + 1 stop bit
+BITS_PER_BYTE = 10
+
+# Telemetry rates (Hz) the simulated firmware streams by default
+DEFAULT_RATES = {
+    FRAME_DISTANCE: 20,
+    FRAME_LINE: 50,
+    FRAME_CLIMATE: 0.5,
+    FRAME_HEARTBEAT: 2,
+}
+
+# Step of the simulation loop
+TICK = 0.001
+
+
+class RoverSimulator:
+    """8051 firmware model: command parser, motors, sensors and UART timing
+
+    Bytes written by the phone sit in the HC-05 receive buffer and drain
+    into the firmware at the UART byte rate; `write` blocks while that
+    buffer is full, like RFCOMM flow control does. Telemetry frames are
+    serialised at the same byte rate towards the phone. Command latency is
+    measured from the phone's write to the firmware acting on the newline.
+    """
+
+    def __init__(self, baudrate=9600, hc05_buffer=256, rates=None, seed=None):
+        self.byte_time = BITS_PER_BYTE / float(baudrate)
+        self.hc05_buffer = hc05_buffer
+        self.default_rates = dict(DEFAULT_RATES if rates is None else rates)
+        self.rates = dict(self.default_rates)
+        self.rate_changes = 0
+        self.random = random.Random(seed)
+
+        # Firmware state
+        self.motion = 'S'
+        self.commands_executed = 0
+        self.command_latency = LatencyWindow(4096)
+        self.distance = 120.0
+        self.line_offset = 0.0
+        self.temperature = 24.0
+        self.humidity = 55.0
+        self.heartbeats = 0
+
+        # Phone -> rover
+        self._rx = deque()              # (byte, write time) waiting in the HC-05
+        self._rx_line = []
+        self._rx_started = None
+        self._rx_credit = 0.0
+        self.bytes_received = 0
+
+        # Rover -> phone
+        self._tx_busy_until = 0.0
+        self._tx_pending = deque()      # (ready time, frame bytes)
+        self._phone_rx = bytearray()
+        self._next_frame = {}
+        self.bytes_sent = 0
+
+        self._lock = threading.Condition()
+        self._running = False
+        self._thread = None
+        self._last_step = 0.0
+
+    # Lifecycle
+
+    def start(self):
+        if self._running:
+            return
+        # Firmware boots streaming at its default rates
+        self.rates = dict(self.default_rates)
+        now = time.monotonic()
+        self._rx.clear()
+        self._rx_line = []
+        self._rx_started = None
+        self._tx_pending.clear()
+        self._phone_rx.clear()
+        self._running = True
+        self._last_step = now
+        self._tx_busy_until = now
+        self._next_frame = {frame_type: now for frame_type in self.rates}
+        self._thread = threading.Thread(target=self._run, name='rover-simulator', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            self._running = False
+            self._lock.notify_all()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    # Phone side
+
+    def write(self, data):
+        """Queue bytes into the HC-05, blocking while its buffer is full"""
+        now = time.monotonic()
+        with self._lock:
+            for byte in data:
+                while self._running and len(self._rx) >= self.hc05_buffer:
+                    self._lock.wait(self.byte_time)
+                if not self._running:
+                    raise IOError("Link closed")
+                self._rx.append((byte, now))
+
+    def read_into(self, buffer, timeout=None):
+        """Deliver received telemetry, -1 once the simulator stopped"""
+        with self._lock:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while self._running and not self._phone_rx:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return 0
+                self._lock.wait(remaining)
+            if not self._phone_rx:
+                return -1
+            count = min(len(buffer), len(self._phone_rx))
+            buffer[:count] = self._phone_rx[:count]
+            del self._phone_rx[:count]
+            return count
+
+    # Simulation
+
+    def _run(self):
+        while True:
+            time.sleep(TICK)
+            with self._lock:
+                if not self._running:
+                    return
+                self._step(time.monotonic())
+
+    def _step(self, now):
+        dt = now - self._last_step
+        self._last_step = now
+
+        # UART receive: drain the HC-05 buffer at the byte rate
+        self._rx_credit = min(self._rx_credit + dt / self.byte_time, self.hc05_buffer)
+        drained = False
+        while self._rx and self._rx_credit >= 1.0:
+            byte, written = self._rx.popleft()
+            self._rx_credit -= 1.0
+            self.bytes_received += 1
+            drained = True
+            self._firmware_byte(byte, written, now)
+        if not self._rx:
+            # UART idles; the next byte starts its own byte time when it arrives
+            self._rx_credit = 0.0
+        if drained:
+            self._lock.notify_all()
+
+        self._update_world(dt)
+
+        # Sensor sampling and UART transmit
+        for frame_type, rate in self.rates.items():
+            if rate > 0 and now >= self._next_frame[frame_type]:
+                self._next_frame[frame_type] = now + 1.0 / rate
+                frame = self._sample(frame_type)
+                start = max(now, self._tx_busy_until)
+                self._tx_busy_until = start + len(frame) * self.byte_time
+                self._tx_pending.append((self._tx_busy_until, frame))
+
+        delivered = False
+        while self._tx_pending and self._tx_pending[0][0] <= now:
+            frame = self._tx_pending.popleft()[1]
+            self._phone_rx += frame
+            self.bytes_sent += len(frame)
+            delivered = True
+        if delivered:
+            self._lock.notify_all()
+
+    def _firmware_byte(self, byte, written, now):
+        if self._rx_started is None:
+            self._rx_started = written
+        if byte == 0x0A:
+            command = bytes(self._rx_line).decode('ascii', 'replace').strip()
+            self._rx_line = []
+            if command in ('F', 'L', 'R', 'B', 'S'):
+                self.motion = command
+                self.commands_executed += 1
+                self.command_latency.add(now - self._rx_started)
+            else:
+                rate = parse_rate_command(command)
+                if rate is not None and rate[0] in self.rates:
+                    self.rates[rate[0]] = rate[1]
+                    self._next_frame[rate[0]] = now
+                    self.rate_changes += 1
+            self._rx_started = None
+        else:
+            self._rx_line.append(byte)
+
+    def _update_world(self, dt):
+        # Crude kinematics: 40 cm/s forward and back, turning sweeps the sonar
+        if self.motion == 'F':
+            self.distance -= 40 * dt
+        elif self.motion == 'B':
+            self.distance += 40 * dt
+        elif self.motion in ('L', 'R'):
+            self.distance += (self.random.uniform(0, 200) - self.distance) * min(1.0, 2 * dt)
+            self.line_offset += (-1.0 if self.motion == 'L' else 1.0) * 1.5 * dt
+        self.distance = max(2.0, min(400.0, self.distance))
+        self.line_offset += self.random.gauss(0, 0.3) * dt
+        self.line_offset = max(-1.5, min(1.5, self.line_offset))
+
+    def _sample(self, frame_type):
+        if frame_type == FRAME_DISTANCE:
+            return encode_frame(FRAME_DISTANCE, int(self.distance + self.random.gauss(0, 1)))
+        if frame_type == FRAME_LINE:
+            # Line under sensors spaced at -0.8, 0 and +0.8
+            readings = [int(max(0.0, 255 * (1 - abs(self.line_offset - offset) * 1.25)))
+                        for offset in (0.8, 0.0, -0.8)]
+            return encode_frame(FRAME_LINE, *readings)
+        if frame_type == FRAME_CLIMATE:
+            self.temperature += self.random.gauss(0, 0.05)
+            self.humidity += self.random.gauss(0, 0.1)
+            return encode_frame(FRAME_CLIMATE, int(self.temperature * 10),
+                                int(max(0.0, min(100.0, self.humidity)) * 10))
+        if frame_type == FRAME_HEARTBEAT:
+            self.heartbeats = (self.heartbeats + 1) & 0xFF
+            return encode_frame(FRAME_HEARTBEAT, self.heartbeats)
+        raise ValueError(frame_type)
+
+
+class SimulatedLink(Link):
+    """Link backed by an in-process RoverSimulator
+
+    `connect_time` models the RFCOMM connect delay; `drop()` simulates the
+    rover going out of range (optionally staying unreachable for a while)
+    so reconnect handling can be exercised.
+    """
+
+    name = 'Simulator'
+
+    def __init__(self, simulator=None, connect_time=0.05, **simulator_options):
+        self.simulator = simulator or RoverSimulator(**simulator_options)
+        self.connect_time = connect_time
+        self.opens = 0
+        self._open = False
+        self._unreachable_until = 0.0
+
+    def open(self):
+        if self.connect_time:
+            time.sleep(self.connect_time)
+        if time.monotonic() < self._unreachable_until:
+            raise IOError("Rover out of range")
+        self.simulator.start()
+        self.opens += 1
+        self._open = True
+
+    def write(self, data):
+        if not self._open:
+            raise IOError("Link closed")
+        self.simulator.write(data)
+
+    def read_into(self, buffer):
+        if not self._open:
+            return -1
+        return self.simulator.read_into(buffer)
+
+    def close(self):
+        self._open = False
+        self.simulator.stop()
+
+    def drop(self, outage=0.0):
+        """Simulate the link dropping, unreachable for `outage` seconds"""
+        self._unreachable_until = time.monotonic() + outage
+        self._open = False
+        self.simulator.stop()
+
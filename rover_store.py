@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Smart Rover - Telemetry Store
+SQLite (WAL) database of climate, distance and command history that survives
+app restarts, with per-minute rollups (grouped into hours or longer on
+query) for fast charts and exports
+
+Writers only append to an in-memory batch; a background thread inserts each
+batch with executemany in a single transaction and updates the rollups.
+Queries open their own connection and, thanks to WAL, never wait for the
+writer. Call them from a background thread, not the UI thread.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from rover_metrics import PROFILER
+
+# Raw tables: name -> value columns (each row is (ts, values...), ts in epoch seconds)
+TABLES = {
+    'climate': ('temperature', 'humidity'),
+    'distance': ('cm',),
+    'commands': ('command', 'ok'),
+}
+
+# Tables with a <name>_minute rollup of samples, sum, min and max per column
+ROLLUPS = ('climate', 'distance')
+
+# Seconds between batch writes, and pending rows that trigger an early one
+FLUSH_INTERVAL = 1.0
+BATCH_SIZE = 500
+
+# Rows held in memory while the writer is behind or the database failed
+MAX_PENDING = 50000
+
+# Raw rows are kept a week, rollups a year
+RAW_RETENTION = 7 * 86400
+ROLLUP_RETENTION = 365 * 86400
+PRUNE_INTERVAL = 3600
+
+DAY = 86400
+
+# Rows fetched and formatted per step of a CSV export
+CSV_CHUNK_ROWS = 256
+
+
+def _schema():
+    statements = []
+    for table, columns in TABLES.items():
+        statements.append(f"CREATE TABLE IF NOT EXISTS {table} (ts REAL NOT NULL, "
+                          + ", ".join(columns) + ")")
+        statements.append(f"CREATE INDEX IF NOT EXISTS {table}_ts ON {table} (ts)")
+    for table in ROLLUPS:
+        columns = ", ".join(f"{column}_sum REAL, {column}_min REAL, {column}_max REAL"
+                            for column in TABLES[table])
+        statements.append(f"CREATE TABLE IF NOT EXISTS {table}_minute "
+                          f"(minute INTEGER PRIMARY KEY, samples INTEGER, {columns})")
+    statements.append("CREATE TABLE IF NOT EXISTS commands_minute (minute INTEGER, command TEXT, "
+                      "count INTEGER, errors INTEGER, PRIMARY KEY (minute, command)) WITHOUT ROWID")
+    return ";\n".join(statements) + ";"
+
+
+def _insert_sql(table):
+    columns = TABLES[table]
+    return (f"INSERT INTO {table} (ts, {', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * (len(columns) + 1))})")
+
+
+def _rollup_sql(table):
+    """Upsert merging one minute's partial aggregate into the rollup row"""
+    names = ['samples']
+    updates = ['samples = samples + excluded.samples']
+    for column in TABLES[table]:
+        names += [f'{column}_sum', f'{column}_min', f'{column}_max']
+        updates += [f'{column}_sum = {column}_sum + excluded.{column}_sum',
+                    f'{column}_min = min({column}_min, excluded.{column}_min)',
+                    f'{column}_max = max({column}_max, excluded.{column}_max)']
+    return (f"INSERT INTO {table}_minute (minute, {', '.join(names)}) "
+            f"VALUES ({', '.join('?' * (len(names) + 1))}) "
+            f"ON CONFLICT (minute) DO UPDATE SET {', '.join(updates)}")
+
+
+COMMAND_ROLLUP_SQL = ("INSERT INTO commands_minute (minute, command, count, errors) "
+                      "VALUES (?, ?, ?, ?) ON CONFLICT (minute, command) DO UPDATE SET "
+                      "count = count + excluded.count, errors = errors + excluded.errors")
+
+
+def rollup_rows(rows):
+    """Aggregate (ts, values...) rows into (minute, samples, sum, min, max...) rows"""
+    minutes = {}
+    for row in rows:
+        minute = int(row[0] // 60)
+        entry = minutes.get(minute)
+        if entry is None:
+            entry = minutes[minute] = [0]
+            for value in row[1:]:
+                entry += [0.0, value, value]
+        entry[0] += 1
+        for i, value in enumerate(row[1:]):
+            base = 1 + 3 * i
+            entry[base] += value
+            if value < entry[base + 1]:
+                entry[base + 1] = value
+            if value > entry[base + 2]:
+                entry[base + 2] = value
+    return [(minute,) + tuple(entry) for minute, entry in minutes.items()]
+
+
+class TelemetryStore:
+    """Persistent telemetry history written in batches from a background thread
+
+    `record_*` and the `on_climate` / `on_distance` telemetry listeners are
+    safe to call from any thread and only append to a list. The writer
+    thread owns the write connection; it flushes every `flush_interval`
+    seconds, or sooner once `batch_size` rows are pending, and prunes old
+    rows once an hour.
+    """
+
+    def __init__(self, path, flush_interval=FLUSH_INTERVAL, batch_size=BATCH_SIZE,
+                 raw_retention=RAW_RETENTION, rollup_retention=ROLLUP_RETENTION):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.raw_retention = raw_retention
+        self.rollup_retention = rollup_retention
+
+        self.rows_written = 0
+        self.flushes = 0
+        self.dropped = 0
+        self.error = None
+        self.ready = threading.Event()
+
+        self._pending = {table: [] for table in TABLES}
+        self._pending_count = 0
+        self._taken = 0
+        self._written = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._flushed = threading.Condition()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='rover-store', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """Write what is pending and close the database"""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    # Writing (any thread)
+
+    def record_climate(self, timestamp, temperature, humidity):
+        self._append('climate', (timestamp, temperature, humidity))
+
+    def record_distance(self, timestamp, cm):
+        self._append('distance', (timestamp, cm))
+
+    def record_command(self, timestamp, command, ok=True):
+        self._append('commands', (timestamp, command, 1 if ok else 0))
+
+    def on_climate(self, values, timestamp):
+        # Reader thread: raw values are tenths of a degree / percent
+        self.record_climate(time.time(), values[0] / 10., values[1] / 10.)
+
+    def on_distance(self, values, timestamp):
+        self.record_distance(time.time(), values[0])
+
+    def _append(self, table, row):
+        with self._lock:
+            if self._pending_count >= MAX_PENDING:
+                self.dropped += 1
+                return
+            self._pending[table].append(row)
+            self._pending_count += 1
+            full = self._pending_count >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def flush(self, timeout=2.0):
+        """Wake the writer and wait until everything pending is written"""
+        if self._thread is None:
+            return False
+        # The next batch taken holds every row appended before this point
+        with self._lock:
+            target = self._taken + 1
+        self._wake.set()
+        with self._flushed:
+            return bool(self._flushed.wait_for(lambda: self._written >= target or self.error,
+                                               timeout))
+
+    # Writer thread
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=5.0)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _run(self):
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = self._connect()
+            db.executescript(_schema())
+        except (OSError, sqlite3.Error) as e:
+            self.error = str(e)
+            print(f"Telemetry store unavailable: {e}")
+            self.ready.set()
+            with self._flushed:
+                self._flushed.notify_all()
+            return
+        self.ready.set()
+
+        pruned_at = 0.0
+        try:
+            while True:
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                stopping = self._stopping.is_set()
+                self._write(db, *self._take())
+                if time.time() - pruned_at > PRUNE_INTERVAL:
+                    pruned_at = time.time()
+                    self._prune(db)
+                if stopping:
+                    break
+        finally:
+            db.close()
+
+    def _take(self):
+        with self._lock:
+            batch = self._pending
+            self._pending = {table: [] for table in TABLES}
+            self._pending_count = 0
+            self._taken += 1
+            return self._taken, batch
+
+    def _write(self, db, generation, batch):
+        count = sum(len(rows) for rows in batch.values())
+        if count:
+            if PROFILER.enabled:
+                start = time.perf_counter()
+            try:
+                # One transaction per batch: a single WAL commit however many rows
+                with db:
+                    for table, rows in batch.items():
+                        if rows:
+                            db.executemany(_insert_sql(table), rows)
+                    for table in ROLLUPS:
+                        if batch[table]:
+                            db.executemany(_rollup_sql(table), rollup_rows(batch[table]))
+                    if batch['commands']:
+                        db.executemany(COMMAND_ROLLUP_SQL, self._command_rollup(batch['commands']))
+                self.rows_written += count
+            except sqlite3.Error as e:
+                self.dropped += count
+                print(f"Telemetry store write failed: {e}")
+            if PROFILER.enabled:
+                PROFILER.record('store.flush', time.perf_counter() - start)
+                PROFILER.count('store.rows', count)
+            self.flushes += 1
+        with self._flushed:
+            self._written = generation
+            self._flushed.notify_all()
+
+    def _command_rollup(self, rows):
+        counts = {}
+        for timestamp, command, ok in rows:
+            entry = counts.setdefault((int(timestamp // 60), command), [0, 0])
+            entry[0] += 1
+            if not ok:
+                entry[1] += 1
+        return [key + tuple(entry) for key, entry in counts.items()]
+
+    def _prune(self, db):
+        now = time.time()
+        try:
+            with db:
+                for table in TABLES:
+                    db.execute(f"DELETE FROM {table} WHERE ts < ?", (now - self.raw_retention,))
+                for table in ROLLUPS + ('commands',):
+                    db.execute(f"DELETE FROM {table}_minute WHERE minute < ?",
+                               (int((now - self.rollup_retention) // 60),))
+        except sqlite3.Error as e:
+            print(f"Telemetry store prune failed: {e}")
+
+    # Queries (background threads)
+
+    def _reader(self):
+        if not self.ready.wait(5.0) or self.error:
+            raise sqlite3.OperationalError(self.error or "Telemetry store not ready")
+        db = sqlite3.connect(self.path, timeout=5.0)
+        db.execute("PRAGMA query_only=1")
+        return db
+
+    def _query(self, sql, params=()):
+        db = self._reader()
+        try:
+            return db.execute(sql, params).fetchall()
+        finally:
+            db.close()
+
+    def rows(self, table, since, until=None):
+        """Raw (ts, values...) rows of one table, oldest first"""
+        until = time.time() if until is None else until
+        return self._query(f"SELECT ts, {', '.join(TABLES[table])} FROM {table} "
+                           f"WHERE ts >= ? AND ts < ? ORDER BY ts", (since, until))
+
+    def rollup(self, table, since, until=None, bucket=60):
+        """(ts, mean, min, max...) rows of one table per `bucket` seconds, oldest first
+
+        `bucket` is a whole number of minutes; coarser buckets (3600 for an
+        hourly view over a month) are grouped from the per-minute rollups.
+        """
+        until = time.time() if until is None else until
+        minutes = max(1, int(bucket // 60))
+        columns = ", ".join(f"sum({column}_sum) / sum(samples), min({column}_min), "
+                            f"max({column}_max)" for column in TABLES[table])
+        return self._query(f"SELECT minute / {minutes} * {minutes * 60}, {columns} "
+                           f"FROM {table}_minute WHERE minute >= ? AND minute < ? "
+                           f"GROUP BY minute / {minutes} ORDER BY 1",
+                           (int(since // 60), int(until // 60) + 1))
+
+    def summary(self, table, since, until=None):
+        """{column: (min, max, mean)} over a period, from the rollups"""
+        until = time.time() if until is None else until
+        columns = TABLES[table]
+        aggregates = ", ".join(f"min({column}_min), max({column}_max), "
+                               f"sum({column}_sum) / sum(samples)" for column in columns)
+        row = self._query(f"SELECT {aggregates} FROM {table}_minute "
+                          f"WHERE minute >= ? AND minute < ?",
+                          (int(since // 60), int(until // 60) + 1))[0]
+        return {column: tuple(row[3 * i:3 * i + 3]) for i, column in enumerate(columns)}
+
+    def command_counts(self, since, until=None):
+        """{command: (count, errors)} over a period"""
+        until = time.time() if until is None else until
+        rows = self._query("SELECT command, sum(count), sum(errors) FROM commands_minute "
+                           "WHERE minute >= ? AND minute < ? GROUP BY command",
+                           (int(since // 60), int(until // 60) + 1))
+        return {command: (count, errors) for command, count, errors in rows}
+
+    def export_csv(self, path, table, since, until=None, chunk_rows=CSV_CHUNK_ROWS):
+        """Stream raw rows of one table to a CSV file, returns the number of rows"""
+        until = time.time() if until is None else until
+        columns = TABLES[table]
+        db = self._reader()
+        rows = 0
+        try:
+            cursor = db.execute(f"SELECT ts, {', '.join(columns)} FROM {table} "
+                                f"WHERE ts >= ? AND ts < ? ORDER BY ts", (since, until))
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                f.write(','.join(('timestamp',) + columns) + '\n')
+                while True:
+                    chunk = cursor.fetchmany(chunk_rows)
+                    if not chunk:
+                        break
+                    f.write(''.join(
+                        datetime.fromtimestamp(row[0]).isoformat(timespec='seconds') + ','
+                        + ','.join(f"{value:.1f}" if isinstance(value, float) else str(value)
+                                   for value in row[1:]) + '\n'
+                        for row in chunk
+                    ))
+                    rows += len(chunk)
+        finally:
+            db.close()
+        return rows
+
+    def report(self):
+        """One-line write statistics"""
+        text = f"Store {self.rows_written} rows, {self.flushes} flushes"
+        if self.dropped:
+            text += f", {self.dropped} dropped"
+        if self.error:
+            text += f" ({self.error})"
+        return text
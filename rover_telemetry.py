@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Smart Rover - Telemetry Protocol
+Incremental parser for the framed sensor stream sent by the 8051
+
+Frame layout (all integers big-endian):
+    0xAA | type | length | payload[length] | checksum
+where checksum = (type + length + sum(payload)) & 0xFF
+
+Stream rates are set with an ASCII command alongside the motion opcodes:
+    T<type>:<period ms>\n      (period 0 pauses the stream)
+"""
+
+import struct
+import time
+
+from rover_metrics import PROFILER
+
+SYNC_BYTE = 0xAA
+HEADER_SIZE = 3
+MAX_PAYLOAD = 32
+
+# Frame types
+FRAME_DISTANCE = 0x01   # uint16 distance in cm (HC-SR04)
+FRAME_LINE = 0x02       # 3 x uint8 IR reflectance, left/center/right
+FRAME_CLIMATE = 0x03    # int16 temperature * 10, uint16 humidity * 10 (DHT22)
+FRAME_HEARTBEAT = 0x04  # uint8 rolling counter, keeps the link-health check fed
+
+FRAME_FORMATS = {
+    FRAME_DISTANCE: struct.Struct('>H'),
+    FRAME_LINE: struct.Struct('>BBB'),
+    FRAME_CLIMATE: struct.Struct('>hH'),
+    FRAME_HEARTBEAT: struct.Struct('>B'),
+}
+
+
+def frame_size(frame_type):
+    """Bytes one frame of `frame_type` takes on the wire"""
+    return HEADER_SIZE + FRAME_FORMATS[frame_type].size + 1
+
+
+def rate_command(frame_type, rate_hz):
+    """Command asking the rover to stream `frame_type` at `rate_hz` (0 pauses)"""
+    period = int(round(1000. / rate_hz)) if rate_hz > 0 else 0
+    return f"T{frame_type}:{period}"
+
+
+def parse_rate_command(command):
+    """(frame type, rate in Hz) from a rate command, None if it is not one"""
+    if not command.startswith('T') or ':' not in command:
+        return None
+    try:
+        frame_type, period = (int(part) for part in command[1:].split(':', 1))
+    except ValueError:
+        return None
+    return frame_type, (1000. / period if period > 0 else 0.0)
+
+
+def encode_frame(frame_type, *values):
+    """Build one frame, used by the simulator and tests of the parser"""
+    payload = FRAME_FORMATS[frame_type].pack(*values)
+    checksum = (frame_type + len(payload) + sum(payload)) & 0xFF
+    return bytes((SYNC_BYTE, frame_type, len(payload))) + payload + bytes((checksum,))
+
+
+class TelemetryState:
+    """Latest decoded value of every stream, updated in place
+
+    Screens poll this once per frame and compare the `*_seq` counters
+    instead of receiving a callback (and an allocation) per sample.
+    """
+
+    __slots__ = ('distance', 'distance_seq',
+                 'ir_left', 'ir_center', 'ir_right', 'line_seq',
+                 'temperature', 'humidity', 'climate_seq',
+                 'heartbeat_seq', 'last_frame_time')
+
+    def __init__(self):
+        self.distance = 0
+        self.distance_seq = 0
+        self.ir_left = 0
+        self.ir_center = 0
+        self.ir_right = 0
+        self.line_seq = 0
+        self.temperature = 0.0
+        self.humidity = 0.0
+        self.climate_seq = 0
+        self.heartbeat_seq = 0
+        self.last_frame_time = 0.0
+
+
+class TelemetryParser:
+    """Parses frames out of a fixed-size bytearray buffer
+
+    Incoming chunks are copied into the buffer; the parser then scans for
+    sync bytes with `bytearray.find` and validates checksums with `sum()`
+    over a memoryview, so the per-byte work all happens in C.
+    """
+
+    def __init__(self, capacity=4096):
+        self.state = TelemetryState()
+        self.frames = 0
+        self.bad_frames = 0
+        self.listener_errors = 0
+        self.bytes_received = 0
+        self.chunks = 0
+
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._head = 0
+        self._tail = 0
+        self._listeners = {}
+
+    def add_listener(self, frame_type, callback):
+        """Call `callback(values, timestamp)` for every decoded frame of a type
+
+        Listeners run on the reader thread; keep them short. An exception in
+        one is logged and counted, never passed to the reader, where it would
+        look like a lost link.
+        """
+        self._listeners.setdefault(frame_type, []).append(callback)
+
+    def remove_listener(self, frame_type, callback):
+        """Remove a listener added with add_listener"""
+        listeners = self._listeners.get(frame_type)
+        if listeners and callback in listeners:
+            listeners.remove(callback)
+
+    def reset(self):
+        """Drop any partially received frame"""
+        self._head = self._tail = 0
+
+    def feed(self, data, length=None, timestamp=None):
+        """Append received bytes and parse every complete frame
+
+        Frames are stamped with time.monotonic() unless `timestamp` is given
+        (session replay passes the recorded receive time).
+        """
+        if length is None:
+            length = len(data)
+        self.bytes_received += length
+        self.chunks += 1
+        if PROFILER.enabled:
+            start = time.perf_counter()
+            frames = self.frames
+
+        offset = 0
+        capacity = len(self._buffer)
+        while offset < length:
+            if self._tail == capacity:
+                self._compact()
+                if self._tail == capacity:
+                    # Buffer is full of garbage without a valid frame
+                    self.reset()
+            count = min(length - offset, capacity - self._tail)
+            self._view[self._tail:self._tail + count] = data[offset:offset + count]
+            self._tail += count
+            offset += count
+            self._parse(timestamp)
+
+        if PROFILER.enabled:
+            PROFILER.record('telemetry.parse', time.perf_counter() - start)
+            PROFILER.count('telemetry.bytes', length)
+            PROFILER.count('telemetry.frames', self.frames - frames)
+
+    def _compact(self):
+        remaining = self._tail - self._head
+        if remaining and self._head:
+            self._buffer[:remaining] = self._buffer[self._head:self._tail]
+        self._head = 0
+        self._tail = remaining
+
+    def _parse(self, now=None):
+        buffer = self._buffer
+        view = self._view
+        head = self._head
+        tail = self._tail
+        if now is None:
+            now = time.monotonic()
+
+        while True:
+            start = buffer.find(SYNC_BYTE, head, tail)
+            if start < 0:
+                head = tail
+                break
+            if tail - start < HEADER_SIZE:
+                head = start
+                break
+
+            frame_type = buffer[start + 1]
+            length = buffer[start + 2]
+            fmt = FRAME_FORMATS.get(frame_type)
+            if length > MAX_PAYLOAD or (fmt is not None and fmt.size != length):
+                # Not a real header, resync on the next sync byte
+                self.bad_frames += 1
+                head = start + 1
+                continue
+
+            end = start + HEADER_SIZE + length
+            if end >= tail:
+                head = start
+                break
+            if (sum(view[start + 1:end]) & 0xFF) != buffer[end]:
+                self.bad_frames += 1
+                head = start + 1
+                continue
+
+            head = end + 1
+            self.frames += 1
+            if fmt is not None:
+                self._dispatch(frame_type, fmt.unpack_from(buffer, start + HEADER_SIZE), now)
+
+        if head == tail:
+            head = tail = 0
+        self._head = head
+        self._tail = tail
+
+    def _dispatch(self, frame_type, values, now):
+        state = self.state
+        state.last_frame_time = now
+        if frame_type == FRAME_DISTANCE:
+            state.distance = values[0]
+            state.distance_seq += 1
+        elif frame_type == FRAME_LINE:
+            state.ir_left, state.ir_center, state.ir_right = values
+            state.line_seq += 1
+        elif frame_type == FRAME_CLIMATE:
+            state.temperature = values[0] / 10.
+            state.humidity = values[1] / 10.
+            state.climate_seq += 1
+        elif frame_type == FRAME_HEARTBEAT:
+            state.heartbeat_seq += 1
+
+        listeners = self._listeners.get(frame_type)
+        if listeners:
+            for callback in listeners:
+                try:
+                    callback(values, now)
+                except Exception as e:
+                    self.listener_errors += 1
+                    print(f"Telemetry listener {getattr(callback, '__qualname__', callback)} failed: {e}")
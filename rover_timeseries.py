@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Smart Rover - Sensor Time Series
+Fixed-memory history for DHT22 readings with rolling statistics
+"""
+
+import threading
+from array import array
+from collections import deque
+
+
+class TimeSeries:
+    """Ring buffer of timestamps plus N float columns stored in array('d')"""
+
+    def __init__(self, capacity, fields):
+        self.capacity = capacity
+        self.fields = tuple(fields)
+        self.times = array('d', bytes(8 * capacity))
+        self.columns = [array('d', bytes(8 * capacity)) for _ in self.fields]
+        self.count = 0
+        self.appended = 0
+        self._next = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, timestamp, values):
+        """Store one sample, overwriting the oldest when full"""
+        index = self._next
+        self.times[index] = timestamp
+        for column, value in zip(self.columns, values):
+            column[index] = value
+        self._next = index + 1 if index + 1 < self.capacity else 0
+        if self.count < self.capacity:
+            self.count += 1
+        self.appended += 1
+
+    def clear(self):
+        self.count = 0
+        self._next = 0
+
+    def index(self, position):
+        """Physical slot of the `position`-th oldest sample"""
+        start = self._next - self.count
+        return (start + position) % self.capacity
+
+    def latest(self):
+        """(timestamp, values) of the newest sample, or None when empty"""
+        if not self.count:
+            return None
+        index = self._next - 1
+        return self.times[index], tuple(column[index] for column in self.columns)
+
+    def window(self, column, count):
+        """Newest `count` values of one column as a contiguous array"""
+        count = min(count, self.count)
+        data = self.columns[column]
+        end = self._next
+        start = end - count
+        if start >= 0:
+            return data[start:end]
+        return data[start:] + data[:end]
+
+    def rows(self, start=0, stop=None):
+        """Yield (timestamp, value...) tuples from oldest to newest"""
+        stop = self.count if stop is None else min(stop, self.count)
+        times = self.times
+        columns = self.columns
+        capacity = self.capacity
+        index = self.index(start)
+        for _ in range(start, stop):
+            yield (times[index],) + tuple(column[index] for column in columns)
+            index += 1
+            if index == capacity:
+                index = 0
+
+
+class RollingStats:
+    """Min/max/mean over the last `window` samples, O(1) amortized per update
+
+    Min and max use monotonic deques; the mean keeps a running sum.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._values = deque()
+        self._mins = deque()
+        self._maxs = deque()
+        self._sum = 0.0
+        self._seen = 0
+
+    def update(self, value):
+        seq = self._seen
+        self._seen += 1
+        self._values.append(value)
+        self._sum += value
+
+        mins = self._mins
+        while mins and mins[-1][1] >= value:
+            mins.pop()
+        mins.append((seq, value))
+        maxs = self._maxs
+        while maxs and maxs[-1][1] <= value:
+            maxs.pop()
+        maxs.append((seq, value))
+
+        if len(self._values) > self.window:
+            self._sum -= self._values.popleft()
+            oldest = self._seen - self.window
+            if mins[0][0] < oldest:
+                mins.popleft()
+            if maxs[0][0] < oldest:
+                maxs.popleft()
+
+    @property
+    def min(self):
+        return self._mins[0][1] if self._mins else None
+
+    @property
+    def max(self):
+        return self._maxs[0][1] if self._maxs else None
+
+    @property
+    def mean(self):
+        return self._sum / len(self._values) if self._values else None
+
+
+class SensorHistory:
+    """Raw ring and rolling statistics for one sensor
+
+    Longer history (per-minute rollups, CSV export) lives in the telemetry
+    store.
+
+    Appends come from the telemetry reader thread; readers take the same
+    lock for each chunk they copy out, never for a whole export.
+    """
+
+    def __init__(self, fields=('temperature', 'humidity'), capacity=3600, stats_window=60):
+        self.fields = tuple(fields)
+        self.raw = TimeSeries(capacity, self.fields)
+        self.stats = [RollingStats(stats_window) for _ in self.fields]
+        self.lock = threading.Lock()
+
+    def append(self, timestamp, *values):
+        with self.lock:
+            self.raw.append(timestamp, values)
+            for stats, value in zip(self.stats, values):
+                stats.update(value)
+
+    def summary(self, field):
+        """(min, max, mean) of the rolling window for one field"""
+        stats = self.stats[self.fields.index(field)]
+        with self.lock:
+            return stats.min, stats.max, stats.mean
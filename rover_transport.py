@@ -0,0 +1,773 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Smart Rover - Bluetooth Transport
+Dedicated I/O worker that keeps blocking HC-05 socket calls off the Kivy UI thread,
+plus the pluggable links it drives (Android RFCOMM, serial/PTY, in-process simulator)
+"""
+
+import random
+import threading
+import time
+from collections import deque
+
+from rover_metrics import PROFILER
+from rover_session import KIND_RX, KIND_TX
+
+# Connection states pushed back to the UI
+STATE_DISCONNECTED = 'disconnected'
+STATE_CONNECTING = 'connecting'
+STATE_CONNECTED = 'connected'
+STATE_RECONNECTING = 'reconnecting'
+STATE_ERROR = 'error'
+
+# What happens to commands issued while reconnecting
+OUTAGE_DROP = 'drop'        # rejected, send() returns False
+OUTAGE_LATEST = 'latest'    # only the most recent command is kept and sent on recovery
+OUTAGE_BUFFER = 'buffer'    # queued up to max_pending and sent in order on recovery
+
+# Link health and reconnect timing (seconds)
+HEARTBEAT_TIMEOUT = 1.5
+HEALTH_CHECK_INTERVAL = 0.25
+RECONNECT_BASE_DELAY = 0.05
+RECONNECT_MAX_DELAY = 5.0
+
+# Wire encoding for the 8051 opcodes, built once instead of per press
+COMMAND_BYTES = {command: f"{command}\n".encode('ascii') for command in 'FLRBS'}
+
+# Minimum spacing between writes; presses landing inside one frame share a write
+FRAME_INTERVAL = 1 / 60.
+
+# Scheduled writes wake this early and spin the rest, as thread wakeups jitter by ~1 ms
+SCHEDULE_SPIN = 0.002
+
+# Serial Port Profile UUID used by the HC-05
+SPP_UUID = "00001101-0000-1000-8000-00805F9B34FB"
+
+
+def kivy_dispatch(callback, *args):
+    """Run callback on the Kivy main thread at the next frame"""
+    from kivy.clock import Clock
+    Clock.schedule_once(lambda dt: callback(*args), 0)
+
+
+def detach_jvm_thread():
+    """Release the JNI environment pyjnius attached to the current thread"""
+    try:
+        from jnius import detach
+    except ImportError:
+        return
+    detach()
+
+
+def coalesce_commands(commands):
+    """Collapse consecutive duplicates so a burst costs one opcode per change"""
+    kept = []
+    previous = None
+    for command in commands:
+        if command != previous:
+            kept.append(command)
+            previous = command
+    return kept
+
+
+class Link:
+    """Byte pipe to one rover
+
+    Every method may block and is only ever called from the transport
+    worker or telemetry reader threads.
+    """
+
+    name = 'link'
+
+    def open(self):
+        """Establish the connection, raising on failure"""
+        raise NotImplementedError
+
+    def write(self, data):
+        """Write and flush `data`"""
+        raise NotImplementedError
+
+    def read_into(self, buffer):
+        """Block until data arrives; fill `buffer` and return the count, -1 at EOF"""
+        raise NotImplementedError
+
+    def close(self):
+        """Close the connection, unblocking any pending read"""
+        raise NotImplementedError
+
+
+class RfcommLink(Link):
+    """HC-05 over an Android Bluetooth RFCOMM socket (pyjnius)
+
+    `BluetoothDevice` handles are cached by MAC address for the life of the
+    process, so reconnecting skips the bonded-device scan entirely. The
+    output and input streams are fetched once when the socket opens.
+    """
+
+    # MAC address -> BluetoothDevice, device name -> MAC address
+    _devices = {}
+    _addresses = {}
+
+    def __init__(self, device_name, address=None):
+        self.name = device_name
+        self.device_name = device_name
+        self.address = address or self._addresses.get(device_name)
+        self._socket = None
+        self._output = None
+        self._input = None
+
+    def _resolve_device(self, adapter):
+        if self.address:
+            device = self._devices.get(self.address)
+            if device is None:
+                device = adapter.getRemoteDevice(self.address)
+                self._devices[self.address] = device
+            return device
+
+        # First connection to this name: one bonded scan fills the cache
+        if PROFILER.enabled:
+            start = time.perf_counter()
+        for device in adapter.getBondedDevices().toArray():
+            address = device.getAddress()
+            self._devices[address] = device
+            self._addresses[device.getName()] = address
+        if PROFILER.enabled:
+            PROFILER.record('link.scan', time.perf_counter() - start)
+        self.address = self._addresses.get(self.device_name)
+        return self._devices.get(self.address)
+
+    def open(self):
+        from jnius import autoclass
+        BluetoothAdapter = autoclass('android.bluetooth.BluetoothAdapter')
+        UUID = autoclass('java.util.UUID')
+
+        adapter = BluetoothAdapter.getDefaultAdapter()
+        if not adapter.isEnabled():
+            raise RuntimeError("Please enable Bluetooth first!")
+
+        target_device = self._resolve_device(adapter)
+        if not target_device:
+            raise RuntimeError("Selected device not found!")
+
+        # Create socket and connect
+        bluetooth_socket = target_device.createRfcommSocketToServiceRecord(UUID.fromString(SPP_UUID))
+        try:
+            bluetooth_socket.connect()
+            self._output = bluetooth_socket.getOutputStream()
+            self._input = bluetooth_socket.getInputStream()
+        except Exception:
+            bluetooth_socket.close()
+            raise
+        self._socket = bluetooth_socket
+
+    def write(self, data):
+        self._output.write(data)
+        self._output.flush()
+
+    def read_into(self, buffer):
+        # pyjnius copies the Java byte[] back into the bytearray
+        return self._input.read(buffer, 0, len(buffer))
+
+    def close(self):
+        bluetooth_socket, self._socket = self._socket, None
+        self._output = self._input = None
+        if bluetooth_socket is not None:
+            bluetooth_socket.close()
+
+
+class SerialLink(Link):
+    """USB-serial adapter or PTY (e.g. socat) through pyserial"""
+
+    def __init__(self, port, baudrate=9600, timeout=0.2):
+        self.name = port
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self._serial = None
+
+    def open(self):
+        try:
+            import serial
+        except ImportError:
+            raise RuntimeError("pyserial is required for serial links")
+        self._serial = serial.Serial(self.port, self.baudrate, timeout=self.timeout)
+
+    def write(self, data):
+        self._serial.write(data)
+        self._serial.flush()
+
+    def read_into(self, buffer):
+        port = self._serial
+        if port is None:
+            return -1
+        # Wait for the first byte, then take whatever else is already buffered
+        first = port.read(1)
+        if not first:
+            return 0 if self._serial is not None else -1
+        buffer[0] = first[0]
+        waiting = min(port.in_waiting, len(buffer) - 1)
+        if waiting:
+            rest = port.read(waiting)
+            buffer[1:1 + len(rest)] = rest
+            return 1 + len(rest)
+        return 1
+
+    def close(self):
+        port, self._serial = self._serial, None
+        if port is not None:
+            port.close()
+
+
+class CommandWriter:
+    """Persistent writer bound to one open link
+
+    Every batch goes out as a single write followed by a single flush.
+    """
+
+    def __init__(self, link, recorder=None):
+        self.link = link
+        self.recorder = recorder
+        self.bytes_written = 0
+
+    def write(self, commands):
+        """Write a batch of commands, returns the number of bytes sent"""
+        if len(commands) == 1:
+            data = COMMAND_BYTES.get(commands[0]) or f"{commands[0]}\n".encode('utf-8')
+        else:
+            data = b''.join(COMMAND_BYTES.get(command) or f"{command}\n".encode('utf-8')
+                            for command in commands)
+        return self.write_bytes(data)
+
+    def write_bytes(self, data):
+        """Write already encoded commands, returns the number of bytes sent"""
+        self.link.write(data)
+        self.bytes_written += len(data)
+        if self.recorder is not None:
+            self.recorder.record(KIND_TX, data)
+        return len(data)
+
+
+class TelemetryReader:
+    """Background thread pulling bulk chunks from a link
+
+    Reads land in one reusable bytearray and are handed straight to the
+    telemetry parser; the thread exits when the link closes or errors.
+    """
+
+    def __init__(self, link, parser, chunk_size=512, on_closed=None, recorder=None):
+        self.link = link
+        self.parser = parser
+        self.on_closed = on_closed
+        self.recorder = recorder
+        self._chunk = bytearray(chunk_size)
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Start reading on a daemon thread"""
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='rover-telemetry', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Ask the thread to exit; closing the socket unblocks a pending read"""
+        self._running = False
+
+    def _run(self):
+        error = None
+        chunk = self._chunk
+        try:
+            while self._running:
+                count = self.link.read_into(chunk)
+                if count < 0:
+                    break
+                if count:
+                    if self.recorder is not None:
+                        self.recorder.record(KIND_RX, bytes(chunk[:count]))
+                    self.parser.feed(chunk, count)
+        except Exception as e:
+            error = str(e)
+        finally:
+            # Only report closes nobody asked for
+            unexpected = self._running
+            self._running = False
+            detach_jvm_thread()
+            if unexpected and self.on_closed:
+                self.on_closed(self, error or "Link closed by rover")
+
+
+class TransportWorker:
+    """Owns the rover link and performs every blocking call on its own thread
+
+    The UI thread only enqueues work. Connection state changes and send
+    results are delivered back through `dispatch` (Clock.schedule_once by
+    default), so a stalled RFCOMM link never freezes the frame loop.
+
+    A connected link is considered lost when a write fails, the telemetry
+    reader hits EOF, or telemetry that was flowing goes silent for
+    `heartbeat_timeout`. The worker then reopens the same link in the
+    background with jittered exponential backoff; commands issued in the
+    meantime follow `outage_policy`.
+    """
+
+    def __init__(self, on_state=None, on_result=None, max_pending=32, dispatch=None,
+                 frame_interval=FRAME_INTERVAL, telemetry=None, auto_reconnect=True,
+                 outage_policy=OUTAGE_LATEST, heartbeat_timeout=HEARTBEAT_TIMEOUT,
+                 reconnect_base=RECONNECT_BASE_DELAY, reconnect_max=RECONNECT_MAX_DELAY,
+                 name='rover-transport'):
+        self.name = name
+        self.on_state = on_state
+        self.on_result = on_result
+        self.telemetry = telemetry
+        self.dispatch = dispatch or kivy_dispatch
+        self.frame_interval = frame_interval
+        self.auto_reconnect = auto_reconnect
+        self.outage_policy = outage_policy
+        self.heartbeat_timeout = heartbeat_timeout
+        self.reconnect_base = reconnect_base
+        self.reconnect_max = reconnect_max
+        self.state = STATE_DISCONNECTED
+        self.reconnects = 0
+        self.last_recovery = None
+        self.recorder = None
+        self.wakeups = 0
+
+        # Control operations (connect/disconnect) are never dropped; motion
+        # commands live in a bounded queue that discards the oldest entry
+        # when full, since only the most recent direction matters
+        self._control = deque()
+        self._commands = deque(maxlen=max_pending)
+        self._wakeup = threading.Condition()
+        self.link = None
+        self._writer = None
+        self._reader = None
+        self._last_write = 0.0
+        self._writing = 0
+        self._urgent = False
+        self._queued_at = 0.0
+        self._batch_queued_at = 0.0
+        self._running = False
+        self._thread = None
+
+        # Timed byte schedule being played (worker thread only)
+        self._schedule = None
+        self._schedule_start = 0.0
+        self._schedule_index = 0
+        self._schedule_lateness = []
+        self._schedule_done = None
+
+        # Link health and reconnect bookkeeping (worker thread only)
+        self._rx_baseline = 0
+        self._rx_seen = 0
+        self._rx_time = 0.0
+        self._lost_at = 0.0
+        self._attempt = 0
+        self._next_attempt = 0.0
+        self._reconnect_link = None
+
+    # Public API (UI thread)
+
+    def start(self):
+        """Start the worker thread"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Close the link and stop the worker thread"""
+        with self._wakeup:
+            self._running = False
+            self._control.append(('disconnect', None))
+            self._wakeup.notify()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def connect(self, link):
+        """Queue a connection attempt; `link.open()` runs on the worker thread"""
+        self._post_control('connect', link)
+
+    def disconnect(self):
+        """Queue a disconnect, cancelling any reconnect in progress"""
+        self._post_control('disconnect', None)
+
+    def send(self, command, urgent=False):
+        """Queue a command for transmission, returns False when it was rejected
+
+        An urgent command (e.g. an all-stop) replaces everything still queued
+        and is written without waiting for the next frame slot.
+        """
+        state = self.state
+        if state == STATE_RECONNECTING:
+            if self.outage_policy == OUTAGE_DROP:
+                return False
+            with self._wakeup:
+                if self.outage_policy == OUTAGE_LATEST:
+                    self._commands.clear()
+                self._commands.append(command)
+            return True
+        if state != STATE_CONNECTED:
+            return False
+        with self._wakeup:
+            if PROFILER.enabled:
+                PROFILER.count('command.queued')
+                if not self._commands:
+                    self._queued_at = time.perf_counter()
+            if urgent:
+                self._commands.clear()
+                self._urgent = True
+            self._commands.append(command)
+            self._wakeup.notify()
+        return True
+
+    def send_config(self, command):
+        """Queue a link configuration command (e.g. a telemetry rate), returns False when rejected
+
+        Only accepted while connected. It travels with the control
+        operations, so it can never evict or be coalesced with a motion
+        command, and it is not reported through `on_result`.
+        """
+        if self.state != STATE_CONNECTED:
+            return False
+        self._post_control('config', command)
+        return True
+
+    def run_schedule(self, schedule, on_done=None):
+        """Play a precompiled [(offset seconds, bytes), ...] schedule on the worker thread
+
+        Each entry is written at schedule start + offset, measured against
+        absolute targets so late steps never push back later ones. Returns
+        False when not connected. `on_done(report)` is dispatched when the
+        schedule completes, is aborted or the link drops.
+        """
+        if self.state != STATE_CONNECTED or not schedule:
+            return False
+        self._post_control('schedule', (list(schedule), on_done))
+        return True
+
+    def abort_schedule(self):
+        """Cancel the running schedule and stop the rover immediately"""
+        self._post_control('abort', None)
+
+    @property
+    def schedule_active(self):
+        return self._schedule is not None
+
+    def set_recorder(self, recorder):
+        """Record all traffic on the current and future links to `recorder` (None stops)"""
+        self.recorder = recorder
+        writer, reader = self._writer, self._reader
+        if writer is not None:
+            writer.recorder = recorder
+        if reader is not None:
+            reader.recorder = recorder
+
+    @property
+    def pending(self):
+        """Number of commands waiting to be written"""
+        return len(self._commands)
+
+    @property
+    def in_flight(self):
+        """Commands queued or currently being written to the link"""
+        return len(self._commands) + self._writing
+
+    # Worker thread
+
+    def _post_control(self, op, arg):
+        with self._wakeup:
+            self._control.append((op, arg))
+            self._wakeup.notify()
+
+    def _run(self):
+        try:
+            self._loop()
+        finally:
+            detach_jvm_thread()
+
+    def _idle_timeout(self):
+        if self._schedule is not None:
+            target = self._schedule_start + self._schedule[self._schedule_index][0]
+            return max(0.0, min(HEALTH_CHECK_INTERVAL, target - SCHEDULE_SPIN - time.monotonic()))
+        if self.state == STATE_CONNECTED and self.telemetry is not None and self.heartbeat_timeout:
+            return HEALTH_CHECK_INTERVAL
+        if self.state == STATE_RECONNECTING:
+            return max(0.0, self._next_attempt - time.monotonic())
+        return None
+
+    def _loop(self):
+        while True:
+            op = arg = None
+            self.wakeups += 1
+            with self._wakeup:
+                sendable = self._commands and self.state == STATE_CONNECTED
+                if self._running and not self._control and not sendable:
+                    self._wakeup.wait(self._idle_timeout())
+                    sendable = self._commands and self.state == STATE_CONNECTED
+
+                if self._control:
+                    op, arg = self._control.popleft()
+                elif sendable:
+                    # Let presses from the same frame accumulate into one write
+                    delay = self._last_write + self.frame_interval - time.monotonic()
+                    if delay > 0 and not self._urgent:
+                        if self._schedule is not None:
+                            delay = min(delay, self._idle_timeout())
+                        self._wakeup.wait(delay)
+                        self._play_schedule()
+                        continue
+                    self._urgent = False
+                    op, arg = 'send', list(self._commands)
+                    self._batch_queued_at, self._queued_at = self._queued_at, 0.0
+                    self._writing = len(arg)
+                    self._commands.clear()
+                elif not self._running:
+                    return
+
+            if op == 'connect':
+                self._do_connect(arg)
+            elif op == 'disconnect':
+                self._do_disconnect()
+                if not self._running:
+                    return
+            elif op == 'send':
+                self._do_send(arg)
+            elif op == 'lost':
+                reader, error = arg
+                if reader is self._reader:
+                    self._link_lost(error)
+            elif op == 'config':
+                self._do_config(arg)
+            elif op == 'schedule':
+                self._start_schedule(*arg)
+            elif op == 'abort':
+                self._abort_schedule()
+
+            self._play_schedule()
+            self._check_link()
+
+    def _set_state(self, state, detail=None):
+        self.state = state
+        if self.recorder is not None:
+            self.recorder.event(f"{state}: {detail}" if detail else state)
+        if self.on_state:
+            self.dispatch(self.on_state, state, detail)
+
+    def _open_link(self, link):
+        """Open `link` and attach the writer and telemetry reader"""
+        if PROFILER.enabled:
+            start = time.perf_counter()
+        link.open()
+        if PROFILER.enabled:
+            PROFILER.record('link.connect', time.perf_counter() - start)
+        self.link = link
+        self._writer = CommandWriter(link, recorder=self.recorder)
+        if self.telemetry is not None:
+            self.telemetry.reset()
+            self._rx_baseline = self._rx_seen = self.telemetry.bytes_received
+            self._rx_time = time.monotonic()
+            self._reader = TelemetryReader(link, self.telemetry, on_closed=self._on_reader_closed,
+                                           recorder=self.recorder)
+            self._reader.start()
+
+    def _close_link(self):
+        """Detach the reader and writer and close the link, returns the close error"""
+        link, self.link = self.link, None
+        self._writer = None
+        if self._reader is not None:
+            self._reader.stop()
+            self._reader = None
+        if link is not None:
+            try:
+                link.close()
+            except Exception as e:
+                return str(e)
+        return None
+
+    def _on_reader_closed(self, reader, error):
+        # Reader thread: hand the loss over to the worker
+        self._post_control('lost', (reader, error))
+
+    def _do_connect(self, link):
+        if self.state in (STATE_CONNECTED, STATE_RECONNECTING):
+            return
+        self._set_state(STATE_CONNECTING)
+        try:
+            self._open_link(link)
+        except Exception as e:
+            self._close_link()
+            self._set_state(STATE_ERROR, str(e))
+            return
+        self._commands.clear()
+        self._set_state(STATE_CONNECTED)
+
+    def _do_disconnect(self):
+        self._commands.clear()
+        self._reconnect_link = None
+        error = self._close_link()
+        if self.state != STATE_DISCONNECTED or error:
+            self._set_state(STATE_DISCONNECTED, error)
+
+    def _link_lost(self, error):
+        if self.state != STATE_CONNECTED:
+            return
+        link = self.link
+        self._close_link()
+        if not self.auto_reconnect:
+            self._commands.clear()
+            self._set_state(STATE_DISCONNECTED, error)
+            return
+        if self.outage_policy == OUTAGE_DROP:
+            self._commands.clear()
+        self._reconnect_link = link
+        self._lost_at = time.monotonic()
+        self._attempt = 0
+        self._next_attempt = self._lost_at
+        self._set_state(STATE_RECONNECTING, error)
+
+    def _check_link(self):
+        now = time.monotonic()
+        if self.state == STATE_CONNECTED and self.telemetry is not None and self.heartbeat_timeout:
+            received = self.telemetry.bytes_received
+            if received != self._rx_seen:
+                self._rx_seen = received
+                self._rx_time = now
+            elif received != self._rx_baseline and now - self._rx_time > self.heartbeat_timeout:
+                # Telemetry was flowing and stopped: the rover is gone
+                self._link_lost("Heartbeat lost")
+        elif self.state == STATE_RECONNECTING and now >= self._next_attempt:
+            self._attempt_reconnect()
+
+    def _attempt_reconnect(self):
+        self._attempt += 1
+        try:
+            self._open_link(self._reconnect_link)
+        except Exception as e:
+            self._close_link()
+            delay = min(self.reconnect_max, self.reconnect_base * 2 ** (self._attempt - 1))
+            self._next_attempt = time.monotonic() + delay * random.uniform(0.5, 1.0)
+            self._set_state(STATE_RECONNECTING, f"Attempt {self._attempt} failed: {e}")
+            return
+        self._reconnect_link = None
+        self.reconnects += 1
+        self.last_recovery = time.monotonic() - self._lost_at
+        self._set_state(STATE_CONNECTED, f"Recovered in {self.last_recovery * 1000:.0f} ms")
+
+    def _start_schedule(self, schedule, on_done):
+        if self._schedule is not None:
+            self._finish_schedule("Replaced by another schedule")
+        self._schedule = schedule
+        self._schedule_index = 0
+        self._schedule_lateness = []
+        self._schedule_done = on_done
+        self._schedule_start = time.monotonic()
+
+    def _play_schedule(self):
+        """Write every schedule entry that is due"""
+        schedule = self._schedule
+        if schedule is None:
+            return
+        if self.state != STATE_CONNECTED:
+            self._finish_schedule("Link lost")
+            return
+        while self._schedule_index < len(schedule):
+            offset, data = schedule[self._schedule_index]
+            target = self._schedule_start + offset
+            now = time.monotonic()
+            if target - now > SCHEDULE_SPIN:
+                return
+            while now < target:
+                now = time.monotonic()
+            try:
+                self._writer.write_bytes(data)
+            except Exception as e:
+                self._finish_schedule(str(e))
+                self._link_lost(str(e))
+                return
+            self._last_write = time.monotonic()
+            self._schedule_lateness.append(self._last_write - target)
+            self._schedule_index += 1
+        self._finish_schedule(None)
+
+    def _abort_schedule(self):
+        if self._schedule is None:
+            return
+        try:
+            if self._writer is not None:
+                self._writer.write_bytes(COMMAND_BYTES['S'])
+                self._last_write = time.monotonic()
+        except Exception as e:
+            self._finish_schedule(str(e), aborted=True)
+            self._link_lost(str(e))
+            return
+        self._finish_schedule(None, aborted=True)
+
+    def _finish_schedule(self, error, aborted=False):
+        lateness = sorted(self._schedule_lateness)
+        report = {
+            'steps': len(self._schedule),
+            'executed': self._schedule_index,
+            'aborted': aborted,
+            'error': error,
+            'duration': time.monotonic() - self._schedule_start,
+        }
+        if lateness:
+            last = len(lateness) - 1
+            report['lateness_p50'] = lateness[last // 2]
+            report['lateness_p99'] = lateness[min(last, int(round(0.99 * last)))]
+            report['lateness_max'] = lateness[-1]
+        on_done = self._schedule_done
+        self._schedule = None
+        self._schedule_done = None
+        if on_done:
+            self.dispatch(on_done, report)
+
+    def _do_config(self, command):
+        if self.state != STATE_CONNECTED or self._writer is None:
+            return
+        try:
+            self._writer.write([command])
+        except Exception as e:
+            self._link_lost(str(e))
+        finally:
+            self._last_write = time.monotonic()
+
+    def _do_send(self, commands):
+        if self.state != STATE_CONNECTED:
+            self._writing = 0
+            return
+        commands = coalesce_commands(commands)
+        if PROFILER.enabled:
+            start = time.perf_counter()
+        try:
+            if self._writer is not None:
+                written = self._writer.write(commands)
+                if PROFILER.enabled:
+                    # The firmware sends no acks: latency runs from queueing to the flushed write
+                    now = time.perf_counter()
+                    PROFILER.record('command.write', now - start)
+                    if self._batch_queued_at:
+                        PROFILER.record('command.latency', now - self._batch_queued_at)
+                    PROFILER.count('command.bytes', written)
+                    PROFILER.count('command.writes')
+        except Exception as e:
+            if self.on_result:
+                self.dispatch(self.on_result, commands, str(e))
+            self._link_lost(str(e))
+            # The failed batch is subject to the outage policy like any other
+            if self.state == STATE_RECONNECTING:
+                with self._wakeup:
+                    if self.outage_policy == OUTAGE_LATEST:
+                        if not self._commands:
+                            self._commands.append(commands[-1])
+                    elif self.outage_policy == OUTAGE_BUFFER:
+                        self._commands.extendleft(reversed(commands))
+            return
+        finally:
+            self._last_write = time.monotonic()
+            self._writing = 0
+        if self.on_result:
+            self.dispatch(self.on_result, commands, None)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Smart Rover - Shared Widgets
+KV rules and reusable widgets (screen header, direction pad, readouts) used by every screen
+"""
+
+from kivy.lang import Builder
+from kivy.properties import StringProperty
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.button import Button
+from kivy.uix.gridlayout import GridLayout
+from kivy.uix.label import Label
+
+from rover_metrics import PROFILER
+
+# Parsed once at import; Kivy compiles each rule and applies it per instance.
+# All text uses the default Roboto font: no emoji or symbol glyphs that would
+# need a fallback font, and a small fixed set of font sizes.
+KV = '''
+<Panel>:
+    orientation: 'vertical'
+    padding: 10
+    spacing: 10
+
+<ScreenHeader>:
+    size_hint_y: None
+    height: '50dp'
+    Button:
+        text: 'Back'
+        size_hint_x: None
+        width: '80dp'
+        background_color: 0.6, 0.6, 0.6, 1
+        on_press: root.dispatch('on_back')
+    Label:
+        text: root.title
+        font_size: '18sp'
+        color: 0.9, 0.9, 0.9, 1
+
+<Readout>:
+    size_hint_y: None
+    height: '50dp'
+    font_size: '20sp'
+    halign: 'center'
+
+<DirectionButton>:
+    font_size: '14sp'
+    background_color: 0.2, 0.6, 0.9, 1
+    on_press: self.parent.press(self.command)
+    on_release: self.parent.release(self.command)
+
+<DirectionPad>:
+    cols: 3
+    spacing: '15dp'
+    size_hint_y: None
+    height: '300dp'
+    Widget
+    DirectionButton:
+        command: 'F'
+        text: 'FORWARD\\n(F)'
+    Widget
+    DirectionButton:
+        command: 'L'
+        text: 'LEFT\\n(L)'
+    DirectionButton:
+        command: 'S'
+        text: 'STOP\\n(S)'
+        background_color: 0.8, 0.2, 0.2, 1
+    DirectionButton:
+        command: 'R'
+        text: 'RIGHT\\n(R)'
+    Widget
+    DirectionButton:
+        command: 'B'
+        text: 'BACKWARD\\n(B)'
+    Widget
+'''
+
+
+class Panel(BoxLayout):
+    """Top-level vertical layout of a screen; counts layout passes when profiling"""
+
+    def do_layout(self, *args):
+        if PROFILER.enabled:
+            PROFILER.count('ui.layout_passes')
+        super().do_layout(*args)
+
+
+class ScreenHeader(BoxLayout):
+    """Back button and title shared by the mode screens
+
+    `on_back` returns to the mode selection screen unless a handler
+    bound to it returns True.
+    """
+
+    title = StringProperty('')
+
+    __events__ = ('on_back',)
+
+    def on_back(self):
+        widget = self.parent
+        while widget is not None and not hasattr(widget, 'manager'):
+            widget = widget.parent
+        if widget is not None and widget.manager is not None:
+            widget.manager.current = 'mode_selection'
+
+    def do_layout(self, *args):
+        if PROFILER.enabled:
+            PROFILER.count('ui.layout_passes')
+        super().do_layout(*args)
+
+
+class Readout(Label):
+    """Fixed-height label for values updated many times a second
+
+    The fixed height means a text change never triggers a relayout of the
+    parent; every re-render is counted as a texture upload when profiling.
+    """
+
+    def on_texture(self, instance, texture):
+        if PROFILER.enabled:
+            PROFILER.count('ui.texture_uploads')
+
+
+class DirectionButton(Button):
+    command = StringProperty('S')
+
+
+class DirectionPad(GridLayout):
+    """F/L/S/R/B pad dispatching `on_direction(command)` and `on_direction_release(command)`
+
+    Stop does not fire a release event, so hold-to-drive handlers can
+    treat every release as "stop holding".
+    """
+
+    __events__ = ('on_direction', 'on_direction_release')
+
+    def press(self, command):
+        self.dispatch('on_direction', command)
+
+    def release(self, command):
+        if command != 'S':
+            self.dispatch('on_direction_release', command)
+
+    def on_direction(self, command):
+        pass
+
+    def on_direction_release(self, command):
+        pass
+
+    def do_layout(self, *args):
+        if PROFILER.enabled:
+            PROFILER.count('ui.layout_passes')
+        super().do_layout(*args)
+
+
+Builder.load_string(KV)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Smart Rover - Line Follower Gain Tuning
+Replays a recorded IR log through a grid of PID gains and ranks them
+
+Usage:
+    python tools/tune_line_follower.py linelog.csv [--top 10]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rover_linefollow import load_line_log, gain_grid, replay_gains
+
+try:
+    import numpy  # noqa: F401
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+def frange(spec):
+    """Parse 'start:stop:count' into a list of evenly spaced values"""
+    start, stop, count = spec.split(':')
+    start, stop, count = float(start), float(stop), int(count)
+    if count == 1:
+        return [start]
+    step = (stop - start) / (count - 1)
+    return [start + i * step for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('log', help='CSV log recorded by the Line Follower screen')
+    parser.add_argument('--kp', default='0.2:3.0:15', help='start:stop:count (default %(default)s)')
+    parser.add_argument('--ki', default='0.0:0.5:6', help='start:stop:count (default %(default)s)')
+    parser.add_argument('--kd', default='0.0:0.3:7', help='start:stop:count (default %(default)s)')
+    parser.add_argument('--plant-gain', type=float, default=2.0,
+                        help='lateral response per unit steering per second')
+    parser.add_argument('--top', type=int, default=10, help='number of gain sets to print')
+    args = parser.parse_args()
+
+    if not NUMPY_AVAILABLE:
+        parser.error("NumPy is required: pip install numpy")
+
+    log = load_line_log(args.log)
+    gains = gain_grid(frange(args.kp), frange(args.ki), frange(args.kd))
+
+    start = time.perf_counter()
+    costs = replay_gains(*log, gains, plant_gain=args.plant_gain)
+    elapsed = time.perf_counter() - start
+
+    print(f"Replayed {len(log[0])} frames x {len(gains)} gain sets in {elapsed:.2f}s")
+    print(f"{'rank':>4}  {'kp':>6}  {'ki':>6}  {'kd':>6}  {'cost':>10}")
+    for rank, index in enumerate(costs.argsort()[:args.top], 1):
+        kp, ki, kd = gains[index]
+        print(f"{rank:>4}  {kp:6.3f}  {ki:6.3f}  {kd:6.3f}  {costs[index]:10.5f}")
+
+
+if __name__ == '__main__':
+    main()